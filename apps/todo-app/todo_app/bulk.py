@@ -0,0 +1,125 @@
+"""Streaming bulk import and export of todos as CSV or JSON Lines."""
+
+import csv
+import json
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+from sqlalchemy import insert, select
+from .models import PRIORITIES, Todo
+
+FORMATS = ("csv", "jsonl")
+FIELDS = ("title", "description", "completed", "priority", "created_at")
+CHUNK_SIZE = 1000
+
+def detect_format(path: str, default: str = "csv") -> str:
+    """Guess the format from a file name."""
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else default
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y", "done")
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).strip())
+    if parsed.tzinfo is not None:
+        # Timestamps are stored as naive UTC, like datetime.utcnow() writes them.
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _to_row(record: Dict[str, Any], line: int, now: datetime) -> Dict[str, Any]:
+    """Validate one input record and turn it into insert parameters."""
+    title = str(record.get("title") or "").strip()
+    if not title:
+        raise ValueError(f"Line {line}: title is required")
+    priority = str(record.get("priority") or "medium").strip().lower()
+    if priority not in PRIORITIES:
+        raise ValueError(f"Line {line}: invalid priority {priority!r}")
+    try:
+        created_at = _parse_datetime(record.get("created_at")) or now
+    except ValueError:
+        raise ValueError(f"Line {line}: invalid created_at {record.get('created_at')!r}")
+
+    return {
+        "title": title[:200],
+        "description": str(record.get("description") or "").strip(),
+        "completed": _parse_bool(record.get("completed")),
+        "priority": priority,
+        "created_at": created_at,
+        "updated_at": now,
+    }
+
+def read_todos(stream: TextIO, fmt: str = "csv") -> Iterator[Dict[str, Any]]:
+    """Lazily parse todos from a CSV (with header) or JSON Lines stream."""
+    now = datetime.utcnow()
+    if fmt == "csv":
+        for line, record in enumerate(csv.DictReader(stream), start=2):
+            yield _to_row(record, line, now)
+    elif fmt == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line}: invalid JSON ({e.msg})")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {line}: expected a JSON object")
+            yield _to_row(record, line, now)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_todos(engine, stream: TextIO, fmt: str = "csv", chunk_size: int = CHUNK_SIZE) -> int:
+    """Insert todos from a stream in executemany chunks inside a single transaction.
+
+    Any invalid record rolls back the whole import. Returns the number of todos inserted.
+    """
+    count = 0
+    with engine.begin() as connection:
+        for chunk in _chunks(read_todos(stream, fmt), chunk_size):
+            connection.execute(insert(Todo.__table__), chunk)
+            count += len(chunk)
+    return count
+
+def export_todos(engine, stream: TextIO, fmt: str = "csv", chunk_size: int = CHUNK_SIZE) -> int:
+    """Write every todo to a stream, fetching ``chunk_size`` rows at a time.
+
+    Returns the number of todos written.
+    """
+    columns = [getattr(Todo, field) for field in FIELDS]
+    count = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(
+            select(*columns).order_by(Todo.id)
+        )
+        if fmt == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(FIELDS)
+        elif fmt != "jsonl":
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        for title, description, completed, priority, created_at in result:
+            created = created_at.isoformat() if created_at else None
+            if fmt == "csv":
+                writer.writerow((title, description or "", int(completed), priority, created or ""))
+            else:
+                stream.write(json.dumps({
+                    "title": title,
+                    "description": description,
+                    "completed": completed,
+                    "priority": priority,
+                    "created_at": created,
+                }) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,205 @@
+"""Process-wide, versioned cache of every todo with write-through updates."""
+
+import asyncio
+import logging
+import sys
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from . import writes
+from .database import engine, write_queue
+from .feed import ChangeFeed
+from .models import PRIORITIES
+from .queries import list_todo_records
+from .records import TodoRecord
+from .store import SortKey, TodoStore
+
+logger = logging.getLogger(__name__)
+
+# Rows handed to a session per page of the todo list.
+PAGE_SIZE = 50
+# Changes kept for sessions catching up; a session further behind reloads its page.
+CHANGE_LOG_SIZE = int(os.getenv("TODO_CACHE_CHANGE_LOG", "1000"))
+
+class TodoChange(NamedTuple):
+    """One committed change: ``row`` is the new row, or None when the todo was deleted."""
+    version: int
+    todo_id: int
+    row: Optional[TodoRecord]
+
+class TodoCache:
+    """Every todo held once per process, shared by all sessions.
+
+    The table is read on first use. After that, writes submitted through the cache
+    are applied to it by the writer thread as soon as they commit, in commit order,
+    and each one bumps ``version`` and lands in a bounded change log. Sessions
+    remember the version their rows came from and catch up with
+    ``changes_since`` instead of re-reading the table.
+
+    Every change is also published on ``feed`` so that open sessions can catch up
+    without waiting for their next event.
+
+    Writes made by other processes, such as ``tools/dev.py import-todos``, are not
+    seen until ``invalidate()`` is called or the process restarts.
+    """
+
+    def __init__(self, loader: Callable[[], List[TodoRecord]], change_log_size: int = CHANGE_LOG_SIZE):
+        self.loader = loader
+        self._lock = threading.RLock()
+        self._store: Optional[TodoStore] = None
+        self._changes: deque = deque(maxlen=change_log_size)
+        self.version = 0
+        self.feed = ChangeFeed()
+
+    def page(
+        self,
+        status: str = "all",
+        priority: str = "all",
+        before: Optional[SortKey] = None,
+        limit: int = PAGE_SIZE,
+    ) -> Tuple[List[TodoRecord], bool, int]:
+        """One page of todos newest first, whether more follow, and the version it reflects."""
+        with self._lock:
+            rows = self._loaded().select(status, priority, before, limit + 1)
+            return rows[:limit], len(rows) > limit, self.version
+
+    def get(self, todo_id: int) -> Optional[TodoRecord]:
+        """The committed row for a todo, or None if it does not exist."""
+        with self._lock:
+            return self._loaded().get(todo_id)
+
+    def counts(self) -> Dict[str, int]:
+        """Totals by completion status."""
+        with self._lock:
+            return self._loaded().counts()
+
+    def changes_since(self, version: int) -> Optional[List[TodoChange]]:
+        """Changes committed after ``version``, or None if they are no longer all in the log."""
+        with self._lock:
+            if version == self.version:
+                return []
+            if not self._changes or self._changes[0].version > version + 1:
+                return None
+            return [change for change in self._changes if change.version > version]
+
+    def invalidate(self) -> None:
+        """Drop the cached rows so the next read reloads them from the database."""
+        with self._lock:
+            self._store = None
+            self._changes.clear()
+            self.version += 1
+        self.feed.publish()
+
+    async def add(self, title: str, description: str, priority: str) -> TodoRecord:
+        """Insert a todo and return it once committed.
+
+        Raises ValueError for an empty title or an unknown priority before anything
+        is queued, so a bad add cannot fail the batch it would have joined.
+        """
+        title = title.strip()
+        if not title:
+            raise ValueError("Title is required")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+        return await self._write(
+            lambda row: self._apply(row.id, row),
+            writes.insert_todo, title=title, description=description, priority=priority,
+        )
+
+    async def toggle(self, todo_id: int, completed: bool) -> Optional[bool]:
+        """Set the completion status a todo was toggled to; return it, or None if the todo is gone."""
+        def apply(completed):
+            if completed is not None:
+                self._apply_changes(todo_id, completed=completed)
+        return await self._write(apply, writes.toggle_todo, todo_id, completed)
+
+    async def delete(self, todo_id: int) -> bool:
+        """Delete a todo and return whether it existed."""
+        def apply(existed):
+            if existed:
+                self._apply(todo_id, None)
+        return await self._write(apply, writes.delete_todo, todo_id)
+
+    async def complete_matching(self, priority: str = "all") -> List[int]:
+        """Complete every pending todo of a priority in one statement; return their ids."""
+        return await self._write(
+            lambda ids: self._apply_updates(ids, completed=True), writes.complete_matching, priority
+        )
+
+    async def delete_completed(self) -> List[int]:
+        """Delete every completed todo in one statement and return their ids."""
+        return await self._write(self._apply_deletes, writes.delete_completed)
+
+    async def set_priority(self, todo_ids: List[int], priority: str) -> List[int]:
+        """Set the priority of several todos in one statement."""
+        return await self._write(
+            lambda ids: self._apply_updates(ids, priority=priority), writes.set_priority, todo_ids, priority
+        )
+
+    async def delete_many(self, todo_ids: List[int]) -> List[int]:
+        """Delete several todos in one statement."""
+        return await self._write(self._apply_deletes, writes.delete_todos, todo_ids)
+
+    async def _write(self, apply: Callable[[Any], None], intent: Callable[..., Any], *args, **kwargs) -> Any:
+        future = write_queue.submit(intent, *args, **kwargs)
+
+        # Runs on the writer thread right after the commit, so the cache sees writes
+        # in commit order and before the submitting event resumes.
+        def on_commit(done: Future) -> None:
+            if done.cancelled() or done.exception() is not None:
+                return
+            try:
+                apply(done.result())
+            except Exception:
+                # A half-applied write would leave every session reading wrong rows.
+                logger.exception("Could not apply a committed todo write; reloading the shared cache")
+                self.invalidate()
+
+        future.add_done_callback(on_commit)
+        return await asyncio.wrap_future(future)
+
+    def _apply_changes(self, todo_id: int, **changes: Any) -> None:
+        with self._lock:
+            if self._store is None:
+                return
+            row = self._store.get(todo_id)
+            if row is not None:
+                self._apply(todo_id, row._replace(**changes))
+
+    def _apply_updates(self, todo_ids: List[int], **changes: Any) -> None:
+        with self._lock:
+            for todo_id in todo_ids:
+                self._apply_changes(todo_id, **changes)
+
+    def _apply_deletes(self, todo_ids: List[int]) -> None:
+        with self._lock:
+            for todo_id in todo_ids:
+                self._apply(todo_id, None)
+
+    def _apply(self, todo_id: int, row: Optional[TodoRecord]) -> None:
+        with self._lock:
+            if self._store is None:
+                return
+            if row is None:
+                self._store.discard(todo_id)
+            else:
+                self._store.put(row)
+            self.version += 1
+            self._changes.append(TodoChange(self.version, todo_id, row))
+        self.feed.publish()
+
+    def _loaded(self) -> TodoStore:
+        if self._store is None:
+            self._store = TodoStore(self.loader())
+            logger.info("Loaded %s todos into the shared cache", len(self._store))
+        return self._store
+
+def _load_all_todos() -> List[TodoRecord]:
+    with engine.connect() as connection:
+        return list(map(TodoRecord._make, connection.execute(list_todo_records())))
+
+todo_cache = TodoCache(_load_all_todos)
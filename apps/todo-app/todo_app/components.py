@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
 from shared.components import themed_button, themed_input, themed_card, error_message, success_message
 from shared.theme import DARK_THEME
+from .records import DESCRIPTION, PRIORITY, TITLE
 from .state import TodoState
 
 def todo_form() -> rx.Component:
@@ -47,7 +48,6 @@ def todo_form() -> rx.Component:
                 on_click=TodoState.add_todo,
                 variant="primary",
                 width="100%",
-                disabled=TodoState.is_loading,
             ),
             spacing="1rem",
             width="100%",
@@ -181,19 +181,27 @@ def todo_stats() -> rx.Component:
         margin_bottom="2rem",
     )
 
-def todo_item(todo: dict) -> rx.Component:
+def todo_item(todo_id: int) -> rx.Component:
     """Component for individual todo item."""
-    priority_colors = {
-        "low": DARK_THEME["text_muted"],
-        "medium": DARK_THEME["warning"],
-        "high": DARK_THEME["error"],
-    }
+    todo = TodoState.todo_entities[todo_id]
+    completed = TodoState.completed_todos[todo_id]
+    priority_color = rx.match(
+        todo[PRIORITY],
+        ("low", DARK_THEME["text_muted"]),
+        ("medium", DARK_THEME["warning"]),
+        DARK_THEME["error"],
+    )
     
     return themed_card(
         rx.hstack(
             rx.checkbox(
-                is_checked=todo["completed"],
-                on_change=lambda: TodoState.toggle_todo(todo["id"]),
+                is_checked=rx.cond(TodoState.selected_todos[todo_id], True, False),
+                on_change=lambda: TodoState.toggle_selected(todo_id),
+                title="Select",
+            ),
+            rx.checkbox(
+                is_checked=rx.cond(completed, True, False),
+                on_change=lambda: TodoState.toggle_todo(todo_id),
                 style={
                     "color": DARK_THEME["primary"],
                     "scale": "1.2",
@@ -202,18 +210,18 @@ def todo_item(todo: dict) -> rx.Component:
             rx.vstack(
                 rx.hstack(
                     rx.text(
-                        todo["title"],
+                        todo[TITLE],
                         font_weight="600",
                         color=DARK_THEME["text_primary"],
-                        text_decoration="line-through" if todo["completed"] else "none",
-                        opacity="0.6" if todo["completed"] else "1",
+                        text_decoration=rx.cond(completed, "line-through", "none"),
+                        opacity=rx.cond(completed, "0.6", "1"),
                     ),
                     rx.badge(
-                        todo["priority"],
+                        todo[PRIORITY],
                         style={
-                            "background_color": f"{priority_colors[todo['priority']]}20",
-                            "color": priority_colors[todo["priority"]],
-                            "border": f"1px solid {priority_colors[todo['priority']]}30",
+                            "background_color": f"{priority_color}20",
+                            "color": priority_color,
+                            "border": f"1px solid {priority_color}30",
                             "border_radius": "12px",
                             "padding": "0.25rem 0.5rem",
                             "font_size": "xs",
@@ -225,12 +233,12 @@ def todo_item(todo: dict) -> rx.Component:
                     width="100%",
                 ),
                 rx.cond(
-                    todo["description"],
+                    todo[DESCRIPTION],
                     rx.text(
-                        todo["description"],
+                        todo[DESCRIPTION],
                         color=DARK_THEME["text_secondary"],
                         font_size="sm",
-                        opacity="0.6" if todo["completed"] else "1",
+                        opacity=rx.cond(completed, "0.6", "1"),
                     ),
                 ),
                 align="start",
@@ -239,7 +247,7 @@ def todo_item(todo: dict) -> rx.Component:
             ),
             themed_button(
                 "Delete",
-                on_click=lambda: TodoState.delete_todo(todo["id"]),
+                on_click=lambda: TodoState.delete_todo(todo_id),
                 variant="outline",
                 size="sm",
                 style={
@@ -255,19 +263,182 @@ def todo_item(todo: dict) -> rx.Component:
             width="100%",
         ),
         margin_bottom="1rem",
-        opacity="0.7" if todo["completed"] else "1",
+        opacity=rx.cond(completed, "0.7", "1"),
+    )
+
+def todo_search() -> rx.Component:
+    """Search box over todo titles and descriptions."""
+    return rx.hstack(
+        themed_input(
+            placeholder="Search todos...",
+            value=TodoState.search_query,
+            on_change=TodoState.set_search_query,
+            debounce_timeout=250,
+            width="100%",
+        ),
+        rx.cond(
+            TodoState.search_query,
+            themed_button(
+                "Clear",
+                on_click=TodoState.clear_search,
+                variant="outline",
+                size="sm",
+            ),
+        ),
+        spacing="1rem",
+        width="100%",
+        margin_bottom="1rem",
+    )
+
+def search_result_item(match: dict) -> rx.Component:
+    """Component for one ranked search match with highlighted text."""
+    highlight_style = {
+        "mark": {
+            "background_color": f"{DARK_THEME['primary']}40",
+            "color": DARK_THEME["text_primary"],
+            "border_radius": "2px",
+        }
+    }
+    
+    return themed_card(
+        rx.hstack(
+            rx.html(
+                match["title"],
+                font_weight="600",
+                color=DARK_THEME["text_primary"],
+                style=highlight_style,
+            ),
+            rx.badge(
+                match["priority"],
+                style={
+                    "border": f"1px solid {DARK_THEME['border_light']}",
+                    "border_radius": "12px",
+                    "padding": "0.25rem 0.5rem",
+                    "font_size": "xs",
+                }
+            ),
+            justify="space-between",
+            align="center",
+            width="100%",
+        ),
+        rx.cond(
+            match["description"],
+            rx.html(
+                match["description"],
+                color=DARK_THEME["text_secondary"],
+                font_size="sm",
+                style=highlight_style,
+            ),
+        ),
+        margin_bottom="1rem",
+        opacity=rx.cond(match["completed"], "0.6", "1"),
+    )
+
+def search_result_list() -> rx.Component:
+    """Component for displaying ranked search matches."""
+    return rx.cond(
+        TodoState.search_matches,
+        rx.vstack(
+            rx.foreach(
+                TodoState.search_matches,
+                search_result_item,
+            ),
+            spacing="0",
+            width="100%",
+        ),
+        rx.text(
+            "No matching todos",
+            color=DARK_THEME["text_muted"],
+            font_size="lg",
+            text_align="center",
+            padding="3rem",
+        ),
     )
 
 def todo_list() -> rx.Component:
-    """Component for displaying list of todos."""
+    """Component for displaying list of todos, or search matches while searching."""
     return rx.box(
+        todo_search(),
+        rx.cond(
+            TodoState.search_query,
+            search_result_list(),
+            todo_page_list(),
+        ),
+        width="100%",
+    )
+
+def todo_bulk_actions() -> rx.Component:
+    """Toolbar for actions that apply to many todos at once."""
+    return rx.hstack(
         rx.cond(
-            TodoState.filtered_todos,
+            TodoState.selected_count > 0,
+            rx.hstack(
+                rx.text(
+                    f"{TodoState.selected_count} selected",
+                    color=DARK_THEME["text_secondary"],
+                    font_size="sm",
+                ),
+                rx.select(
+                    ["low", "medium", "high"],
+                    placeholder="Set priority",
+                    on_change=TodoState.set_selected_priority,
+                    size="sm",
+                ),
+                themed_button(
+                    "Delete selected",
+                    on_click=TodoState.delete_selected,
+                    variant="outline",
+                    size="sm",
+                ),
+                themed_button(
+                    "Clear selection",
+                    on_click=TodoState.clear_selection,
+                    variant="outline",
+                    size="sm",
+                ),
+                spacing="0.5rem",
+            ),
+            rx.hstack(
+                themed_button(
+                    "Complete all matching",
+                    on_click=TodoState.complete_filtered,
+                    variant="outline",
+                    size="sm",
+                ),
+                themed_button(
+                    "Delete completed",
+                    on_click=TodoState.delete_completed,
+                    variant="outline",
+                    size="sm",
+                ),
+                spacing="0.5rem",
+            ),
+        ),
+        justify="end",
+        width="100%",
+        margin_bottom="1rem",
+    )
+
+def todo_page_list() -> rx.Component:
+    """Component for displaying the loaded pages of todos."""
+    return rx.box(
+        todo_bulk_actions(),
+        rx.cond(
+            TodoState.todo_ids,
             rx.vstack(
                 rx.foreach(
-                    TodoState.filtered_todos,
+                    TodoState.todo_ids,
                     todo_item,
                 ),
+                rx.cond(
+                    TodoState.has_more_todos,
+                    themed_button(
+                        "Load more",
+                        on_click=TodoState.load_more_todos,
+                        variant="outline",
+                        width="100%",
+                    ),
+                ),
                 spacing="0",
                 width="100%",
             ),
@@ -2,18 +2,35 @@
 
 import sys
 import os
+from typing import AsyncIterator
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
-from shared.database import create_database_engine, get_session_maker, Base
-from .models import Todo
+from shared.database import (
+    get_engine,
+    get_async_engine,
+    get_session_maker,
+    get_async_session_maker,
+    bootstrap_schema,
+    unit_of_work as shared_unit_of_work,
+    UnitOfWork,
+)
+from shared.write_queue import get_write_queue
+from .migrations import MIGRATIONS
 
-engine = create_database_engine("todo_app")
+engine = get_engine("todo_app")
 SessionLocal = get_session_maker(engine)
 
-def init_db():
-    """Initialize the database."""
-    Base.metadata.create_all(bind=engine)
+async_engine = get_async_engine("todo_app")
+AsyncSessionLocal = get_async_session_maker(async_engine)
+
+# Batches inserts/updates from every session into group commits
+write_queue = get_write_queue("todo_app")
+
+def init_db() -> int:
+    """Initialize the database schema once per process and return its version."""
+    return bootstrap_schema("todo_app", MIGRATIONS, engine)
 
 def get_db() -> Session:
     """Get database session."""
@@ -25,4 +42,21 @@ def get_db() -> Session:
 
 def get_db_session() -> Session:
     """Get database session for direct use."""
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_async_db_session() -> AsyncSession:
+    """Get async database session for direct use in async event handlers."""
+    return AsyncSessionLocal()
+
+def unit_of_work() -> UnitOfWork:
+    """Get the event's shared session: ``with unit_of_work() as db``."""
+    return shared_unit_of_work(SessionLocal)
+
+def async_unit_of_work() -> UnitOfWork:
+    """Get the event's shared async session: ``async with async_unit_of_work() as db``."""
+    return shared_unit_of_work(AsyncSessionLocal)
@@ -0,0 +1,83 @@
+"""In-process change feed that wakes subscribed sessions when todos change."""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Shortest gap between two pushes to one session; changes in between are coalesced.
+PUSH_INTERVAL = float(os.getenv("TODO_FEED_PUSH_MS", "100")) / 1000
+# Longest a session's watcher runs. The page's next event starts a new one, so a
+# closed tab stops holding a task and a subscription within this many seconds.
+WATCH_LIFETIME = float(os.getenv("TODO_FEED_WATCH_SECONDS", "600"))
+
+class Subscription:
+    """One session's wake-up signal.
+
+    It carries no data: the subscriber reads what changed from the cache's version
+    log. However many changes are published before it wakes, it is woken once.
+    """
+
+    __slots__ = ("_loop", "_event", "pending")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+        self.pending = False
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the next publish; return False if ``timeout`` passed first."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        # Cleared before the subscriber reads the log, so a change published while
+        # it reads wakes it again.
+        self._event.clear()
+        self.pending = False
+        return True
+
+class ChangeFeed:
+    """Fan-out of "something changed" to every subscribed session.
+
+    ``publish`` may be called from any thread, including the write queue's.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.wakeups = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Register a subscription on the running event loop."""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self) -> None:
+        """Wake every subscriber that is not already due to wake."""
+        with self._lock:
+            self.published += 1
+            for subscription in list(self._subscribers):
+                if subscription.pending:
+                    continue
+                subscription.pending = True
+                try:
+                    subscription._loop.call_soon_threadsafe(subscription._event.set)
+                except RuntimeError:
+                    # Its event loop is closed, so nobody is waiting any more.
+                    self._subscribers.discard(subscription)
+                    continue
+                self.wakeups += 1
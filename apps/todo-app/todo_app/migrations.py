@@ -0,0 +1,26 @@
+"""Schema migrations for the Todo App."""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import Migration, create_tables, create_indexes
+from .models import Todo
+from .search import create_search_index
+
+# Ordered schema history. Append new entries; never edit or renumber applied ones.
+# Each step names the indexes it creates, so adding one to a model needs a new entry.
+MIGRATIONS = [
+    Migration(1, "Create todos table", create_tables(Todo, indexes=["ix_todos_id"])),
+    Migration(
+        2,
+        "Index todos for newest-first and status/priority listings",
+        create_indexes(Todo, names=["ix_todos_created_at", "ix_todos_completed_priority_created_at"]),
+    ),
+    Migration(
+        3,
+        "Index todos by status for keyset pagination",
+        create_indexes(Todo, names=["ix_todos_completed_created_at"]),
+    ),
+    Migration(4, "Full-text index over todo titles and descriptions", create_search_index),
+]
@@ -1,15 +1,25 @@
 """Database models for the Todo App."""
 
-from sqlalchemy import Column, String, Boolean, Text
+from sqlalchemy import Column, String, Boolean, Text, Index
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
 from shared.database import BaseModel
+from .records import TodoRecord, epoch
+
+# Every priority a todo may have.
+PRIORITIES = ("low", "medium", "high")
 
 class Todo(BaseModel):
     """Todo model for storing tasks."""
     __tablename__ = "todos"
+    __table_args__ = (
+        # Status/priority filters, newest first
+        Index("ix_todos_completed_priority_created_at", "completed", "priority", "created_at"),
+        # Status-only filter, newest first, so keyset pages never sort
+        Index("ix_todos_completed_created_at", "completed", "created_at"),
+    )
     
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
@@ -26,4 +36,16 @@ class Todo(BaseModel):
             "priority": self.priority,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
+        }
+    
+    def to_record(self) -> TodoRecord:
+        """Convert todo to a compact record."""
+        return TodoRecord(
+            self.id,
+            self.title,
+            self.description,
+            self.completed,
+            self.priority,
+            epoch(self.created_at),
+            epoch(self.updated_at),
+        )
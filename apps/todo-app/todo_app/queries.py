@@ -0,0 +1,43 @@
+"""Statements behind the Todo App's hot read paths."""
+
+import sys
+import os
+from sqlalchemy import select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import epoch_seconds, projected_columns
+from .models import Todo
+from .search import match_query, search_todos
+
+def list_todos():
+    """All todos as dictionary rows, newest first."""
+    return select(*projected_columns(Todo)).order_by(Todo.created_at.desc())
+
+def list_todo_records():
+    """All todos, newest first, with columns in ``TodoRecord`` order and epoch timestamps."""
+    return select(
+        Todo.id,
+        Todo.title,
+        Todo.description,
+        Todo.completed,
+        Todo.priority,
+        epoch_seconds(Todo.created_at),
+        epoch_seconds(Todo.updated_at),
+    ).order_by(Todo.created_at.desc())
+
+def todo_by_id(todo_id: int):
+    """A single todo by primary key."""
+    return select(Todo).where(Todo.id == todo_id)
+
+# Queries that must be served from an index; checked by `python tools/dev.py check-plans`.
+HOT_QUERIES = {
+    "list_todos": list_todos(),
+    "list_todo_records": list_todo_records(),
+    "todo_by_id": todo_by_id(1),
+    "search_todos": search_todos(match_query("groceries")),
+    "list_todos_by_status_priority": (
+        select(Todo)
+        .where(Todo.completed == False, Todo.priority == "high")  # noqa: E712
+        .order_by(Todo.created_at.desc())
+    ),
+}
@@ -0,0 +1,34 @@
+"""Compact, typed todo records shared by the cache, sessions and components."""
+
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+# Positions of the fields in a TodoEntity, which reaches the browser as a JSON array.
+TITLE, DESCRIPTION, PRIORITY = range(3)
+
+class TodoEntity(NamedTuple):
+    """The fields of a todo the list renders, sent as ``[title, description, priority]``."""
+    title: str
+    description: Optional[str]
+    priority: str
+
+class TodoRecord(NamedTuple):
+    """One todo, immutable so a single instance can be shared by every session.
+
+    Timestamps are seconds since the epoch (UTC). Field order matches
+    ``queries.list_todo_records`` so result rows map straight onto it.
+    """
+    id: int
+    title: str
+    description: Optional[str]
+    completed: bool
+    priority: str
+    created_at: Optional[float]
+    updated_at: Optional[float]
+
+    def entity(self) -> TodoEntity:
+        return TodoEntity(self.title, self.description, self.priority)
+
+def epoch(value: Optional[datetime]) -> Optional[float]:
+    """Seconds since the epoch for a naive UTC datetime."""
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else None
@@ -0,0 +1,96 @@
+"""Full-text search over todo titles and descriptions with SQLite FTS5."""
+
+import html
+import re
+from typing import Any, Dict, List
+from sqlalchemy import column, func, literal_column, select, table
+from .models import Todo
+
+# Most matches returned for one search.
+SEARCH_LIMIT = 50
+# bm25 weights for the title and description columns; title hits rank higher.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+# Tokens of context around a description match.
+SNIPPET_TOKENS = 12
+
+# Private-use characters mark matches so the text can be escaped before <mark> tags go in.
+_OPEN, _CLOSE = "\ue000", "\ue001"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# External-content index: the text lives only in todos, triggers keep the index in step.
+SEARCH_INDEX_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+        title, description,
+        content='todos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')",
+)
+
+todos_fts = table("todos_fts", column("rowid"))
+_fts = literal_column("todos_fts")
+
+def create_search_index(connection) -> None:
+    """Migration step that creates the FTS5 index and its triggers and fills it from todos."""
+    for ddl in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(ddl)
+
+def match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix.
+
+    Users never write FTS5 syntax, so quotes, operators and column filters in the
+    input are treated as plain words. Returns "" when there is nothing to search for.
+    """
+    return " ".join(f'"{token}"*' for token in _TOKEN_RE.findall(text))
+
+def search_todos(query: str, limit: int = SEARCH_LIMIT):
+    """Todos matching an FTS5 query, best bm25 rank first, with marked-up matches."""
+    return (
+        select(
+            Todo.id,
+            Todo.completed,
+            Todo.priority,
+            func.highlight(_fts, 0, _OPEN, _CLOSE).label("title"),
+            func.snippet(_fts, 1, _OPEN, _CLOSE, "…", SNIPPET_TOKENS).label("description"),
+        )
+        .select_from(todos_fts.join(Todo, Todo.id == todos_fts.c.rowid))
+        .where(_fts.op("MATCH")(query))
+        .order_by(func.bm25(_fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT))
+        .limit(limit)
+    )
+
+def highlight_html(text: str) -> str:
+    """Escape matched text for display and wrap the matches in <mark> tags."""
+    escaped = html.escape(text or "")
+    return escaped.replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+def search_results(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Search rows with their title and description rendered as safe HTML."""
+    return [
+        {**row, "title": highlight_html(row["title"]), "description": highlight_html(row["description"])}
+        for row in rows
+    ]
@@ -1,109 +1,378 @@
 """State management for Todo App."""
 
 import reflex as rx
+import sys
+import os
+import asyncio
+import time
 from typing import List, Dict, Any
-from .database import get_db_session, init_db
-from .models import Todo
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import rows_to_dicts
+from shared.instrumentation import track_queries
+from .cache import todo_cache
+from .database import async_unit_of_work
+from .feed import PUSH_INTERVAL, WATCH_LIFETIME
+from .models import PRIORITIES
+from .search import match_query, search_results, search_todos
+from .records import TodoEntity, TodoRecord
+from .store import TodoStore, sort_key
 
 class TodoState(rx.State):
     """State for managing todos."""
     
-    todos: List[Dict[str, Any]] = []
+    # Only the pages loaded so far, indexed by id, status and priority; more are
+    # read from the shared cache with a keyset cursor.
+    _store: TodoStore = TodoStore()
+    # Version of the shared cache that _store reflects.
+    _version: int = 0
+    # Whether a watch_changes task is running for this session.
+    _watching: bool = False
+    # What the browser renders, normalized so each edit only dirties the var it touches:
+    # visible ids in order, static fields by id, and the ids that are completed.
+    # Completion is kept out of the entities so that a toggle does not resend them.
+    todo_ids: List[int] = []
+    todo_entities: Dict[int, TodoEntity] = {}
+    completed_todos: Dict[int, bool] = {}
+    todos_count: Dict[str, int] = {"total": 0, "completed": 0, "pending": 0}
+    # Last placeholder id handed to an optimistically added todo.
+    _next_temp_id: int = 0
+    # Ids picked for a bulk action.
+    selected_todos: Dict[int, bool] = {}
+    has_more_todos: bool = False
     new_todo_title: str = ""
     new_todo_description: str = ""
     new_todo_priority: str = "medium"
     filter_status: str = "all"  # all, completed, pending
     filter_priority: str = "all"  # all, low, medium, high
-    is_loading: bool = False
+    search_query: str = ""
+    # Ranked matches for search_query with <mark>-highlighted, HTML-escaped text.
+    search_matches: List[Dict[str, Any]] = []
     error_message: str = ""
     success_message: str = ""
     
     def __init__(self):
         super().__init__()
+        self._store = TodoStore()
         self.load_todos()
     
+    def _load_page(self, append: bool):
+        """Load the first page for the current filters, or the page after the oldest loaded row."""
+        before = self._store.oldest_key() if append else None
+        rows, self.has_more_todos, version = todo_cache.page(self.filter_status, self.filter_priority, before)
+        if not append:
+            self._store.clear()
+            self._version = version
+            self.todo_entities = {}
+            self.completed_todos = {}
+        for row in rows:
+            self._put(row)
+        if not append:
+            # Bulk actions apply to the selection, so it may only hold loaded rows.
+            selected = {todo_id: True for todo_id in self.selected_todos if todo_id in self._store}
+            if len(selected) != len(self.selected_todos):
+                self.selected_todos = selected
+        self._refresh_view()
+    
+    def _sync(self):
+        """Apply changes committed by any session since this one last read the cache."""
+        changes = todo_cache.changes_since(self._version)
+        if changes is None:
+            self._load_page(append=False)
+            return
+        
+        for change in changes:
+            if change.row is None:
+                self._discard(change.todo_id)
+            elif change.todo_id in self._store or self._within_loaded(change.row):
+                self._put(change.row)
+            self._version = change.version
+        self._refresh_view()
+    
+    def _put(self, row: TodoRecord):
+        """Store a row, touching only the per-item vars whose values change."""
+        todo_id = row.id
+        previous = self._store.get(todo_id)
+        self._store.put(row)
+        
+        entity = row.entity()
+        if previous is None or previous.entity() != entity:
+            self.todo_entities[todo_id] = entity
+        if row.completed and todo_id not in self.completed_todos:
+            self.completed_todos[todo_id] = True
+        elif not row.completed and todo_id in self.completed_todos:
+            del self.completed_todos[todo_id]
+    
+    def _discard(self, todo_id: int):
+        """Drop a row and its per-item vars."""
+        if self._store.discard(todo_id) is None:
+            return
+        del self.todo_entities[todo_id]
+        if todo_id in self.completed_todos:
+            del self.completed_todos[todo_id]
+        if todo_id in self.selected_todos:
+            del self.selected_todos[todo_id]
+    
+    def _refresh_view(self, counts: bool = True):
+        """Reassign the visible ids and totals, but only when they actually changed.
+        
+        Optimistic edits pass ``counts=False`` to keep their locally adjusted totals
+        until the write lands in the shared cache.
+        """
+        todo_ids = [row.id for row in self._store.select(self.filter_status, self.filter_priority)]
+        if todo_ids != self.todo_ids:
+            self.todo_ids = todo_ids
+        if counts:
+            totals = todo_cache.counts()
+            if totals != self.todos_count:
+                self.todos_count = totals
+    
+    def _adjust_counts(self, completed: int = 0, pending: int = 0):
+        """Apply an optimistic edit to the totals."""
+        totals = dict(self.todos_count)
+        totals["completed"] += completed
+        totals["pending"] += pending
+        totals["total"] = totals["completed"] + totals["pending"]
+        self.todos_count = totals
+    
+    def _revert(self, todo_id: int):
+        """Undo an optimistic edit by restoring the committed row, if there is one."""
+        row = todo_cache.get(todo_id)
+        if row is None:
+            self._discard(todo_id)
+        else:
+            self._put(row)
+        self._refresh_view()
+    
+    def _within_loaded(self, row: TodoRecord) -> bool:
+        """Whether a row belongs among the loaded pages rather than a later one."""
+        oldest = self._store.oldest_key()
+        return oldest is None or not self.has_more_todos or sort_key(row) > oldest
+    
+    @track_queries()
     def load_todos(self):
-        """Load todos from database."""
+        """Load the first page of todos."""
+        try:
+            self._load_page(append=False)
+        except Exception as e:
+            self.error_message = f"Failed to load todos: {str(e)}"
+    
+    @track_queries()
+    def load_more_todos(self):
+        """Append the next page of todos."""
+        if not self.has_more_todos:
+            return
+        
         try:
-            init_db()
-            db = get_db_session()
-            todos = db.query(Todo).order_by(Todo.created_at.desc()).all()
-            self.todos = [todo.to_dict() for todo in todos]
-            db.close()
+            self._sync()
+            self._load_page(append=True)
         except Exception as e:
             self.error_message = f"Failed to load todos: {str(e)}"
     
+    @rx.event(background=True)
+    async def watch_changes(self):
+        """Apply changes from every session as they commit, at most one push per PUSH_INTERVAL.
+        
+        Stops after WATCH_LIFETIME seconds, since nothing tells it that the page was
+        closed; the page's next event starts it again through _keep_watching.
+        """
+        async with self:
+            if self._watching:
+                return
+            self._watching = True
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + WATCH_LIFETIME
+        subscription = todo_cache.feed.subscribe()
+        try:
+            # Catch up on anything committed between the page load and subscribing.
+            async with self:
+                self._sync()
+            while await subscription.wait(max(0.0, deadline - loop.time())):
+                # Let a burst of writes land so it reaches the browser as one delta.
+                await asyncio.sleep(PUSH_INTERVAL)
+                async with self:
+                    self._sync()
+        except Exception as e:
+            async with self:
+                self.error_message = f"Stopped receiving live updates: {str(e)}"
+        finally:
+            todo_cache.feed.unsubscribe(subscription)
+            async with self:
+                self._watching = False
+    
+    def _keep_watching(self):
+        """Restart watch_changes if it stopped while the page stayed open."""
+        return None if self._watching else TodoState.watch_changes
+    
     def add_todo(self):
-        """Add a new todo."""
+        """Add a new todo, showing it at once and saving it in the background."""
         if not self.new_todo_title.strip():
             self.error_message = "Title is required"
             return
         
+        title = self.new_todo_title.strip()
+        description = self.new_todo_description.strip()
+        priority = self.new_todo_priority
+        if priority not in PRIORITIES:
+            self.error_message = f"Invalid priority: {priority}"
+            return
+        
+        # Negative ids stand in for rows the database has not numbered yet.
+        self._next_temp_id -= 1
+        now = time.time()
+        self._put(TodoRecord(self._next_temp_id, title, description, False, priority, now, now))
+        self._adjust_counts(pending=1)
+        self._refresh_view(counts=False)
+        
+        self.new_todo_title = ""
+        self.new_todo_description = ""
+        self.new_todo_priority = "medium"
+        self.success_message = "Todo added successfully!"
+        self.error_message = ""
+        return TodoState.persist_add(self._next_temp_id, title, description, priority)
+    
+    @rx.event(background=True)
+    @track_queries()
+    async def persist_add(self, temp_id: int, title: str, description: str, priority: str):
+        """Save an optimistically added todo and swap in the saved row."""
         try:
-            self.is_loading = True
-            db = get_db_session()
-            
-            new_todo = Todo(
-                title=self.new_todo_title.strip(),
-                description=self.new_todo_description.strip(),
-                priority=self.new_todo_priority,
-                completed=False
-            )
-            
-            db.add(new_todo)
-            db.commit()
-            db.refresh(new_todo)
-            
-            self.todos.insert(0, new_todo.to_dict())
-            self.new_todo_title = ""
-            self.new_todo_description = ""
-            self.new_todo_priority = "medium"
-            self.success_message = "Todo added successfully!"
-            self.error_message = ""
-            
-            db.close()
+            await todo_cache.add(title=title, description=description, priority=priority)
         except Exception as e:
-            self.error_message = f"Failed to add todo: {str(e)}"
-        finally:
-            self.is_loading = False
+            async with self:
+                self._revert(temp_id)
+                self.success_message = ""
+                self.error_message = f"Failed to add todo: {str(e)}"
+            return
+        
+        async with self:
+            self._discard(temp_id)
+            self._sync()
     
     def toggle_todo(self, todo_id: int):
-        """Toggle todo completion status."""
+        """Toggle todo completion status, saving it in the background."""
+        row = self._store.get(todo_id)
+        if row is None or todo_id < 0:
+            return
+        
+        completed = not row.completed
+        self._put(row._replace(completed=completed))
+        self._adjust_counts(completed=1 if completed else -1, pending=-1 if completed else 1)
+        self._refresh_view(counts=False)
+        self.success_message = "Todo updated successfully!"
+        return TodoState.persist_toggle(todo_id, completed)
+    
+    @rx.event(background=True)
+    @track_queries()
+    async def persist_toggle(self, todo_id: int, completed: bool):
+        """Save an optimistic toggle, rolling it back if the write fails."""
         try:
-            db = get_db_session()
-            todo = db.query(Todo).filter(Todo.id == todo_id).first()
-            
-            if todo:
-                todo.completed = not todo.completed
-                db.commit()
-                
-                for i, t in enumerate(self.todos):
-                    if t["id"] == todo_id:
-                        self.todos[i]["completed"] = todo.completed
-                        break
-                
-                self.success_message = "Todo updated successfully!"
-            
-            db.close()
+            await todo_cache.toggle(todo_id, completed)
         except Exception as e:
-            self.error_message = f"Failed to update todo: {str(e)}"
+            async with self:
+                self._revert(todo_id)
+                self.success_message = ""
+                self.error_message = f"Failed to update todo: {str(e)}"
+            return
+        
+        async with self:
+            self._sync()
     
     def delete_todo(self, todo_id: int):
-        """Delete a todo."""
+        """Delete a todo, removing it at once and saving it in the background."""
+        row = self._store.get(todo_id)
+        if row is None or todo_id < 0:
+            return
+        
+        self._discard(todo_id)
+        if row.completed:
+            self._adjust_counts(completed=-1)
+        else:
+            self._adjust_counts(pending=-1)
+        self._refresh_view(counts=False)
+        self.success_message = "Todo deleted successfully!"
+        return TodoState.persist_delete(todo_id)
+    
+    @rx.event(background=True)
+    @track_queries()
+    async def persist_delete(self, todo_id: int):
+        """Save an optimistic delete, restoring the todo if the write fails."""
+        try:
+            await todo_cache.delete(todo_id)
+        except Exception as e:
+            async with self:
+                self._revert(todo_id)
+                self.success_message = ""
+                self.error_message = f"Failed to delete todo: {str(e)}"
+            return
+        
+        async with self:
+            self._sync()
+    
+    def toggle_selected(self, todo_id: int):
+        """Add a loaded todo to, or remove it from, the selection."""
+        if todo_id in self.selected_todos:
+            del self.selected_todos[todo_id]
+        elif todo_id in self._store:
+            self.selected_todos[todo_id] = True
+    
+    def clear_selection(self):
+        """Deselect every todo."""
+        self.selected_todos = {}
+    
+    @track_queries()
+    async def complete_filtered(self):
+        """Complete every pending todo matching the priority filter in one statement."""
+        if self.filter_status == "completed":
+            return
+        
+        try:
+            completed = await todo_cache.complete_matching(self.filter_priority)
+            self._sync()
+            self.success_message = f"Completed {len(completed)} todos"
+        except Exception as e:
+            self.error_message = f"Failed to complete todos: {str(e)}"
+    
+    @track_queries()
+    async def delete_completed(self):
+        """Delete every completed todo in one statement."""
+        try:
+            deleted = await todo_cache.delete_completed()
+            self._sync()
+            self.success_message = f"Deleted {len(deleted)} completed todos"
+        except Exception as e:
+            self.error_message = f"Failed to delete todos: {str(e)}"
+    
+    @track_queries()
+    async def set_selected_priority(self, priority: str):
+        """Change the priority of every selected todo in one statement."""
+        if not self.selected_todos:
+            return
+        if priority not in PRIORITIES:
+            self.error_message = f"Invalid priority: {priority}"
+            return
+        
         try:
-            db = get_db_session()
-            todo = db.query(Todo).filter(Todo.id == todo_id).first()
-            
-            if todo:
-                db.delete(todo)
-                db.commit()
-                
-                self.todos = [t for t in self.todos if t["id"] != todo_id]
-                self.success_message = "Todo deleted successfully!"
-            
-            db.close()
+            updated = await todo_cache.set_priority(list(self.selected_todos), priority)
+            self.selected_todos = {}
+            self._sync()
+            self.success_message = f"Set {len(updated)} todos to {priority} priority"
         except Exception as e:
-            self.error_message = f"Failed to delete todo: {str(e)}"
+            self.error_message = f"Failed to update todos: {str(e)}"
+    
+    @track_queries()
+    async def delete_selected(self):
+        """Delete every selected todo in one statement."""
+        if not self.selected_todos:
+            return
+        
+        try:
+            deleted = await todo_cache.delete_many(list(self.selected_todos))
+            self.selected_todos = {}
+            self._sync()
+            self.success_message = f"Deleted {len(deleted)} todos"
+        except Exception as e:
+            self.error_message = f"Failed to delete todos: {str(e)}"
     
     def set_new_todo_title(self, title: str):
         """Set new todo title."""
@@ -119,42 +388,48 @@ class TodoState(rx.State):
         self.new_todo_priority = priority
     
     def set_filter_status(self, status: str):
-        """Set filter status."""
+        """Set filter status and reload the first matching page."""
         self.filter_status = status
+        self.load_todos()
     
     def set_filter_priority(self, priority: str):
-        """Set filter priority."""
+        """Set filter priority and reload the first matching page."""
         self.filter_priority = priority
+        self.load_todos()
+    
+    @track_queries()
+    async def set_search_query(self, query: str):
+        """Search titles and descriptions, best match first."""
+        self.search_query = query
+        fts_query = match_query(query)
+        if not fts_query:
+            self.search_matches = []
+            return
+        
+        try:
+            async with async_unit_of_work() as db:
+                connection = await db.connection()
+                result = await connection.execute(search_todos(fts_query))
+                self.search_matches = search_results(rows_to_dicts(result))
+        except Exception as e:
+            self.error_message = f"Failed to search todos: {str(e)}"
+    
+    def clear_search(self):
+        """Clear the search box and go back to the list."""
+        self.search_query = ""
+        self.search_matches = []
     
     def clear_messages(self):
-        """Clear success and error messages."""
+        """Clear success and error messages.
+        
+        Every click on the page bubbles up to this handler, so it also restarts
+        live updates that stopped after WATCH_LIFETIME.
+        """
         self.success_message = ""
         self.error_message = ""
+        return self._keep_watching()
     
     @rx.var
-    def filtered_todos(self) -> List[Dict[str, Any]]:
-        """Get filtered todos based on current filters."""
-        filtered = self.todos
-        
-        if self.filter_status == "completed":
-            filtered = [t for t in filtered if t["completed"]]
-        elif self.filter_status == "pending":
-            filtered = [t for t in filtered if not t["completed"]]
-        
-        if self.filter_priority != "all":
-            filtered = [t for t in filtered if t["priority"] == self.filter_priority]
-        
-        return filtered
-    
-    @rx.var
-    def todos_count(self) -> Dict[str, int]:
-        """Get count of todos by status."""
-        total = len(self.todos)
-        completed = len([t for t in self.todos if t["completed"]])
-        pending = total - completed
-        
-        return {
-            "total": total,
-            "completed": completed,
-            "pending": pending
-        }
\ No newline at end of file
+    def selected_count(self) -> int:
+        """Get number of selected todos."""
+        return len(self.selected_todos)
@@ -0,0 +1,107 @@
+"""Indexed in-memory collection of todo records."""
+
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .records import TodoRecord
+
+SortKey = Tuple[float, int]
+
+def sort_key(row: TodoRecord) -> SortKey:
+    """Position of a row in newest-first order: ``(created_at, id)``."""
+    return row.created_at or 0.0, row.id
+
+class TodoStore:
+    """Todo rows keyed by id and bucketed by (completed, priority).
+
+    Each bucket is a list of sort keys kept in ascending order, so a filtered,
+    newest-first view is a lazy merge of a few buckets: reading a page costs
+    O(page) and counting a filter costs O(1), however many rows are held.
+    Buckets are created for whatever priorities the rows carry, so a row with an
+    unexpected priority is held and listed like any other.
+    """
+
+    def __init__(self, rows: Optional[List[TodoRecord]] = None):
+        self._rows: Dict[int, TodoRecord] = {}
+        self._buckets: Dict[Tuple[bool, str], List[SortKey]] = {}
+        for row in rows or ():
+            self.put(row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, todo_id: int) -> bool:
+        return todo_id in self._rows
+
+    def get(self, todo_id: int) -> Optional[TodoRecord]:
+        return self._rows.get(todo_id)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        for bucket in self._buckets.values():
+            bucket.clear()
+
+    def put(self, row: TodoRecord) -> None:
+        """Insert a row, replacing any row with the same id."""
+        self.discard(row.id)
+        self._rows[row.id] = row
+        insort(self._bucket(row), sort_key(row))
+
+    def discard(self, todo_id: int) -> Optional[TodoRecord]:
+        """Remove a row by id and return it, or None if it was not held."""
+        row = self._rows.pop(todo_id, None)
+        if row is not None:
+            bucket = self._bucket(row)
+            del bucket[bisect_left(bucket, sort_key(row))]
+        return row
+
+    def update(self, todo_id: int, **changes: Any) -> Optional[TodoRecord]:
+        """Apply field changes to a held row, moving it between buckets if needed."""
+        row = self._rows.get(todo_id)
+        if row is None:
+            return None
+        self.put(row._replace(**changes))
+        return self._rows[todo_id]
+
+    def count(self, status: str = "all", priority: str = "all") -> int:
+        """Number of held rows matching the filters."""
+        return sum(len(bucket) for bucket in self._matching(status, priority))
+
+    def counts(self) -> Dict[str, int]:
+        """Held rows by completion status."""
+        completed = self.count("completed")
+        pending = self.count("pending")
+        return {"total": completed + pending, "completed": completed, "pending": pending}
+
+    def select(
+        self,
+        status: str = "all",
+        priority: str = "all",
+        before: Optional[SortKey] = None,
+        limit: Optional[int] = None,
+    ) -> List[TodoRecord]:
+        """Rows matching the filters, newest first, optionally after a keyset cursor."""
+        return list(islice(self._iter(status, priority, before), limit))
+
+    def oldest_key(self) -> Optional[SortKey]:
+        """Sort key of the oldest held row."""
+        return min((bucket[0] for bucket in self._buckets.values() if bucket), default=None)
+
+    def _iter(self, status: str, priority: str, before: Optional[SortKey]) -> Iterator[TodoRecord]:
+        streams = []
+        for bucket in self._matching(status, priority):
+            end = len(bucket) if before is None else bisect_left(bucket, before)
+            streams.append(map(bucket.__getitem__, range(end - 1, -1, -1)))
+        for _, todo_id in merge(*streams, reverse=True):
+            yield self._rows[todo_id]
+
+    def _matching(self, status: str, priority: str) -> List[List[SortKey]]:
+        return [
+            bucket for (completed, bucket_priority), bucket in self._buckets.items()
+            if (status == "all" or completed == (status == "completed"))
+            and (priority == "all" or bucket_priority == priority)
+        ]
+
+    def _bucket(self, row: TodoRecord) -> List[SortKey]:
+        return self._buckets.setdefault((bool(row.completed), row.priority), [])
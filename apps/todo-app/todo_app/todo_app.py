@@ -6,7 +6,9 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
 from shared.components import page_header, navigation_bar, error_message, success_message
+from shared.database import schema_lifespan
 from shared.theme import get_base_style, DARK_THEME
+from .database import init_db
 from .state import TodoState
 from .components import todo_form, todo_filters, todo_stats, todo_list
 
@@ -65,7 +67,10 @@ app = rx.App(
     }
 )
 
-app.add_page(index, route="/")
+# Apply pending schema migrations once at server startup instead of per session.
+app.register_lifespan_task(schema_lifespan, init_db=init_db)
+
+app.add_page(index, route="/", on_load=TodoState.watch_changes)
 
 if __name__ == "__main__":
     app.run()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Write intents for the Todo App, run on the shared write queue."""
+
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from .models import Todo
+from .records import TodoRecord
+
+def insert_todo(db: Session, title: str, description: str, priority: str) -> TodoRecord:
+    """Insert a todo and return it as a record."""
+    todo = Todo(title=title, description=description, priority=priority, completed=False)
+    db.add(todo)
+    db.flush()
+    return todo.to_record()
+
+def toggle_todo(db: Session, todo_id: int, completed: bool) -> Optional[bool]:
+    """Set a toggled todo's completion status and return it, or None if the todo is gone.
+
+    The caller passes the value it toggled to, so a toggle that is applied twice,
+    or that races another session's toggle, still leaves the status it showed.
+    """
+    todo = db.get(Todo, todo_id)
+    if todo is None:
+        return None
+    todo.completed = completed
+    return completed
+
+def delete_todo(db: Session, todo_id: int) -> bool:
+    """Delete a todo and return whether it existed."""
+    todo = db.get(Todo, todo_id)
+    if todo is None:
+        return False
+    db.delete(todo)
+    return True
+
+def complete_matching(db: Session, priority: str = "all") -> List[int]:
+    """Mark every pending todo of a priority ("all" for any) completed; return their ids."""
+    stmt = update(Todo).where(Todo.completed == False)  # noqa: E712
+    if priority != "all":
+        stmt = stmt.where(Todo.priority == priority)
+    stmt = stmt.values(completed=True, updated_at=datetime.utcnow()).returning(Todo.id)
+    return list(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
+
+def delete_completed(db: Session) -> List[int]:
+    """Delete every completed todo and return their ids."""
+    stmt = delete(Todo).where(Todo.completed == True).returning(Todo.id)  # noqa: E712
+    return list(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
+
+def set_priority(db: Session, todo_ids: Iterable[int], priority: str) -> List[int]:
+    """Set the priority of the given todos and return the ids that still existed."""
+    stmt = (
+        update(Todo)
+        .where(Todo.id.in_(list(todo_ids)))
+        .values(priority=priority, updated_at=datetime.utcnow())
+        .returning(Todo.id)
+    )
+    return list(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
+
+def delete_todos(db: Session, todo_ids: Iterable[int]) -> List[int]:
+    """Delete the given todos and return the ids that still existed."""
+    stmt = delete(Todo).where(Todo.id.in_(list(todo_ids))).returning(Todo.id)
+    return list(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
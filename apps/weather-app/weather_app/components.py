@@ -39,7 +39,11 @@ def weather_search() -> rx.Component:
                 rx.hstack(
                     loading_spinner("sm"),
                     rx.text(
-                        "Fetching weather data...",
+                        rx.cond(
+                            WeatherState.wait_message,
+                            WeatherState.wait_message,
+                            "Fetching weather data...",
+                        ),
                         color=DARK_THEME["text_secondary"],
                     ),
                     spacing="0.5rem",
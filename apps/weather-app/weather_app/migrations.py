@@ -0,0 +1,60 @@
+"""Schema migrations for the Weather App."""
+
+import sys
+import os
+from sqlalchemy import delete, func, select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import Migration, create_tables, create_indexes
+from .models import WeatherHistory, SavedLocation, WeatherDailySummary, WeatherResponse
+
+def _add_query_indexes(connection):
+    """Drop duplicate saved locations, keeping the oldest, then create the lookup indexes."""
+    oldest = select(func.min(SavedLocation.id)).group_by(SavedLocation.city, SavedLocation.country)
+    connection.execute(delete(SavedLocation).where(SavedLocation.id.not_in(oldest)))
+    create_indexes(
+        WeatherHistory,
+        SavedLocation,
+        names=[
+            "ix_weather_history_created_at",
+            "ix_weather_history_city_created_at",
+            "ix_saved_locations_created_at",
+            "ix_saved_locations_city_country",
+        ],
+    )(connection)
+
+# Ordered schema history. Append new entries; never edit or renumber applied ones.
+# Each step names the indexes it creates, so adding one to a model needs a new entry.
+MIGRATIONS = [
+    Migration(
+        1,
+        "Create weather_history and saved_locations tables",
+        create_tables(WeatherHistory, SavedLocation, indexes=["ix_weather_history_id", "ix_saved_locations_id"]),
+    ),
+    Migration(2, "Index history and saved locations for their list and lookup queries", _add_query_indexes),
+    Migration(
+        3,
+        "Create weather_daily_summaries table for history rollups",
+        create_tables(
+            WeatherDailySummary,
+            indexes=[
+                "ix_weather_daily_summaries_id",
+                "ix_weather_daily_summaries_created_at",
+                "ix_weather_daily_summaries_city_country_day",
+            ],
+        ),
+    ),
+    Migration(
+        4,
+        "Create weather_responses table for the persistent API cache",
+        create_tables(
+            WeatherResponse,
+            indexes=[
+                "ix_weather_responses_id",
+                "ix_weather_responses_created_at",
+                "ix_weather_responses_cache_key",
+                "ix_weather_responses_fetched_at",
+            ],
+        ),
+    ),
+]
@@ -1,6 +1,6 @@
 """Database models for the Weather App."""
 
-from sqlalchemy import Column, String, Float, Integer, Text
+from sqlalchemy import Column, String, Float, Integer, Text, Date, Index
 import sys
 import os
 
@@ -10,6 +10,10 @@ from shared.database import BaseModel
 class WeatherHistory(BaseModel):
     """Weather history model for storing past weather queries."""
     __tablename__ = "weather_history"
+    __table_args__ = (
+        # Per-city history, newest first
+        Index("ix_weather_history_city_created_at", "city", "created_at"),
+    )
     
     city = Column(String(100), nullable=False)
     country = Column(String(50), nullable=True)
@@ -47,6 +51,10 @@ class WeatherHistory(BaseModel):
 class SavedLocation(BaseModel):
     """Saved locations model for user's favorite cities."""
     __tablename__ = "saved_locations"
+    __table_args__ = (
+        # A location can only be saved once
+        Index("ix_saved_locations_city_country", "city", "country", unique=True),
+    )
     
     city = Column(String(100), nullable=False)
     country = Column(String(50), nullable=True)
@@ -65,4 +73,66 @@ class SavedLocation(BaseModel):
             "nickname": self.nickname,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+class WeatherDailySummary(BaseModel):
+    """Per-city daily aggregate of expired weather history rows."""
+    __tablename__ = "weather_daily_summaries"
+    __table_args__ = (
+        # One row per city and day; rollups upsert into it
+        Index("ix_weather_daily_summaries_city_country_day", "city", "country", "day", unique=True),
+    )
+    
+    city = Column(String(100), nullable=False)
+    country = Column(String(50), nullable=False, default="")
+    day = Column(Date, nullable=False)
+    samples = Column(Integer, nullable=False)
+    temperature_min = Column(Float, nullable=False)
+    temperature_max = Column(Float, nullable=False)
+    temperature_avg = Column(Float, nullable=False)
+    humidity_avg = Column(Float, nullable=True)
+    pressure_avg = Column(Float, nullable=True)
+    wind_speed_avg = Column(Float, nullable=True)
+    
+    def to_dict(self):
+        """Convert daily summary to dictionary."""
+        return {
+            "id": self.id,
+            "city": self.city,
+            "country": self.country,
+            "day": self.day.isoformat() if self.day else None,
+            "samples": self.samples,
+            "temperature_min": self.temperature_min,
+            "temperature_max": self.temperature_max,
+            "temperature_avg": self.temperature_avg,
+            "humidity_avg": self.humidity_avg,
+            "pressure_avg": self.pressure_avg,
+            "wind_speed_avg": self.wind_speed_avg,
+        }
+
+class WeatherResponse(BaseModel):
+    """Raw OpenWeatherMap payload kept by the persistent response cache."""
+    __tablename__ = "weather_responses"
+    __table_args__ = (
+        # Lookups by normalized request; eviction walks newest to oldest
+        Index("ix_weather_responses_cache_key", "cache_key", unique=True),
+        Index("ix_weather_responses_fetched_at", "fetched_at"),
+    )
+    
+    cache_key = Column(String(300), nullable=False)
+    endpoint = Column(String(20), nullable=False)
+    payload = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)  # bytes of payload
+    fetched_at = Column(Float, nullable=False)  # seconds since the epoch
+    
+    def to_dict(self):
+        """Convert cached response metadata to dictionary."""
+        return {
+            "id": self.id,
+            "cache_key": self.cache_key,
+            "endpoint": self.endpoint,
+            "size": self.size,
+            "fetched_at": self.fetched_at,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
\ No newline at end of file
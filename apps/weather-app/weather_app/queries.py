@@ -0,0 +1,49 @@
+"""Statements behind the Weather App's hot read paths."""
+
+import sys
+import os
+from typing import Optional
+from sqlalchemy import select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import projected_columns
+from .models import WeatherHistory, SavedLocation, WeatherResponse
+
+HISTORY_LIMIT = 20
+
+def recent_weather_history(limit: int = HISTORY_LIMIT):
+    """Most recent weather searches as dictionary rows, newest first."""
+    return select(*projected_columns(WeatherHistory)).order_by(WeatherHistory.created_at.desc()).limit(limit)
+
+def list_saved_locations():
+    """All saved locations as dictionary rows, newest first."""
+    return select(*projected_columns(SavedLocation)).order_by(SavedLocation.created_at.desc())
+
+def saved_location_by_id(location_id: int):
+    """A single saved location by primary key."""
+    return select(SavedLocation).where(SavedLocation.id == location_id)
+
+def saved_location_exists(city: str, country: Optional[str]):
+    """Id of the saved location for a city and country, if any."""
+    return select(SavedLocation.id).where(
+        SavedLocation.city == city,
+        SavedLocation.country == country
+    ).limit(1)
+
+def weather_response_by_key(cache_key: str):
+    """Payload and fetch time of a persisted API response."""
+    return select(WeatherResponse.payload, WeatherResponse.fetched_at).where(WeatherResponse.cache_key == cache_key)
+
+# Queries that must be served from an index; checked by `python tools/dev.py check-plans`.
+HOT_QUERIES = {
+    "recent_weather_history": recent_weather_history(),
+    "list_saved_locations": list_saved_locations(),
+    "saved_location_by_id": saved_location_by_id(1),
+    "saved_location_exists": saved_location_exists("London", "GB"),
+    "weather_response_by_key": weather_response_by_key('["weather",["q","london"],["units","metric"]]'),
+    "city_weather_history": (
+        select(WeatherHistory)
+        .where(WeatherHistory.city == "London")
+        .order_by(WeatherHistory.created_at.desc())
+    ),
+}
@@ -0,0 +1,88 @@
+"""Persistent tier of the weather response cache, kept in the app's SQLite database."""
+
+import json
+import logging
+import os
+import sys
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from . import writes
+from .database import async_unit_of_work, write_queue
+from .queries import weather_response_by_key
+
+logger = logging.getLogger(__name__)
+
+# Payload bytes kept on disk; the oldest responses are evicted first. 0 turns the tier off.
+PERSISTENT_CACHE_MB = float(os.getenv("WEATHER_PERSISTENT_CACHE_MB", "16"))
+
+def encode_key(key: Tuple[Any, ...]) -> str:
+    """Stable text form of a normalized cache key."""
+    return json.dumps(key, separators=(",", ":"))
+
+class ResponseStore:
+    """Raw API payloads and their fetch times (seconds since the epoch) in ``weather_responses``.
+
+    Entries are read one key at a time, the first time the in-memory cache misses
+    on them, so startup does not read the table. Saves go through the write queue
+    and never hold up or fail the caller: a save that cannot be queued or
+    committed is logged and dropped.
+    """
+
+    def __init__(self, max_bytes: int = int(PERSISTENT_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.loads = 0
+        self.found = 0
+        self.saves = 0
+        self.failures = 0
+        self.evictions = 0
+
+    async def load(self, key: Tuple[Any, ...]) -> Optional[Tuple[Dict[str, Any], float]]:
+        """The stored payload for ``key`` and when it was fetched, or None."""
+        self.loads += 1
+        async with async_unit_of_work() as db:
+            connection = await db.connection()
+            row = (await connection.execute(weather_response_by_key(encode_key(key)))).first()
+        if row is None:
+            return None
+        self.found += 1
+        return json.loads(row.payload), row.fetched_at
+
+    def save(self, key: Tuple[Any, ...], data: Dict[str, Any], fetched_at: float) -> None:
+        """Queue a payload to be stored, replacing any older one for ``key``."""
+        try:
+            future = write_queue.submit(
+                writes.save_weather_response,
+                encode_key(key),
+                key[0],
+                json.dumps(data, separators=(",", ":")),
+                fetched_at,
+                self.max_bytes,
+            )
+        except Exception as e:
+            # e.g. WriteQueueFull; the response is still cached in memory.
+            self.failures += 1
+            logger.warning("Failed to queue cached weather response for saving: %s", e)
+            return
+        future.add_done_callback(self._saved)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since startup."""
+        return {
+            "loads": self.loads,
+            "found": self.found,
+            "saves": self.saves,
+            "failures": self.failures,
+            "evictions": self.evictions,
+        }
+
+    def _saved(self, done: Future) -> None:
+        if done.cancelled():
+            return
+        if done.exception() is not None:
+            self.failures += 1
+            logger.warning("Failed to persist cached weather response: %s", done.exception())
+            return
+        self.saves += 1
+        self.evictions += done.result()
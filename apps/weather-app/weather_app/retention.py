@@ -0,0 +1,213 @@
+"""Retention for weather history: roll up expired rows, delete them and shrink the file."""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.instrumentation import query_scope
+from .models import WeatherHistory, WeatherDailySummary
+
+logger = logging.getLogger(__name__)
+
+# Raw history older than this is rolled up into weather_daily_summaries and deleted.
+HISTORY_TTL_DAYS = int(os.getenv("WEATHER_HISTORY_TTL_DAYS", "30"))
+# Seconds between retention runs.
+RETENTION_INTERVAL = int(os.getenv("WEATHER_RETENTION_INTERVAL", "3600"))
+# Rows handled per transaction, so the write lock is only ever held briefly.
+BATCH_SIZE = 500
+# Pause between batches so request writers waiting on the lock get a turn.
+BATCH_PAUSE = 0.01
+# Free pages handed back to the filesystem per run.
+VACUUM_PAGES = 2000
+
+_AUTO_VACUUM_INCREMENTAL = 2
+
+def _weighted(column, excluded, total):
+    """Merge two averages weighted by their sample counts, tolerating NULLs on either side."""
+    existing = func.coalesce(getattr(WeatherDailySummary, column), getattr(excluded, column))
+    incoming = func.coalesce(getattr(excluded, column), getattr(WeatherDailySummary, column))
+    return (existing * WeatherDailySummary.samples + incoming * excluded.samples) / total
+
+def _rollup_statement(ids, now: datetime):
+    """Upsert per-city daily aggregates of the given history rows."""
+    country = func.coalesce(WeatherHistory.country, "")
+    day = func.date(WeatherHistory.created_at)
+    rows = (
+        select(
+            WeatherHistory.city,
+            country,
+            day,
+            func.count(),
+            func.min(WeatherHistory.temperature),
+            func.max(WeatherHistory.temperature),
+            func.avg(WeatherHistory.temperature),
+            func.avg(WeatherHistory.humidity),
+            func.avg(WeatherHistory.pressure),
+            func.avg(WeatherHistory.wind_speed),
+            literal(now),
+            literal(now),
+        )
+        .where(WeatherHistory.id.in_(ids))
+        .group_by(WeatherHistory.city, country, day)
+    )
+    stmt = sqlite_insert(WeatherDailySummary).from_select(
+        [
+            "city", "country", "day", "samples",
+            "temperature_min", "temperature_max", "temperature_avg",
+            "humidity_avg", "pressure_avg", "wind_speed_avg",
+            "created_at", "updated_at",
+        ],
+        rows,
+    )
+    excluded = stmt.excluded
+    total = WeatherDailySummary.samples + excluded.samples
+    return stmt.on_conflict_do_update(
+        index_elements=["city", "country", "day"],
+        set_={
+            "samples": total,
+            "temperature_min": func.min(WeatherDailySummary.temperature_min, excluded.temperature_min),
+            "temperature_max": func.max(WeatherDailySummary.temperature_max, excluded.temperature_max),
+            "temperature_avg": _weighted("temperature_avg", excluded, total),
+            "humidity_avg": _weighted("humidity_avg", excluded, total),
+            "pressure_avg": _weighted("pressure_avg", excluded, total),
+            "wind_speed_avg": _weighted("wind_speed_avg", excluded, total),
+            "updated_at": excluded.updated_at,
+        },
+    )
+
+def enable_incremental_vacuum(engine, rebuild: bool = False) -> bool:
+    """Switch the database to incremental auto-vacuum and return whether it is on.
+
+    The switch takes a VACUUM. On a database without tables that is instant; on
+    an existing one it rebuilds the file while holding the write lock, so that only
+    happens with ``rebuild=True`` (``python tools/dev.py vacuum-weather``, run while
+    the app is stopped).
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == _AUTO_VACUUM_INCREMENTAL:
+            return True
+        empty = not connection.exec_driver_sql("SELECT count(*) FROM sqlite_master").scalar()
+        if not (empty or rebuild):
+            logger.info(
+                "Incremental auto-vacuum is off; freed pages stay in the file until "
+                "'python tools/dev.py vacuum-weather' is run with the app stopped"
+            )
+            return False
+        if not empty:
+            logger.info("Enabling incremental auto-vacuum (full VACUUM)")
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+        return connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == _AUTO_VACUUM_INCREMENTAL
+
+def incremental_vacuum(engine, max_pages: int = VACUUM_PAGES) -> int:
+    """Release up to ``max_pages`` free pages to the filesystem and return how many were freed."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        before = connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+        if before:
+            # incremental_vacuum frees one page per step and sqlite3's execute() only
+            # steps once for statements without rows; executescript() runs it to completion.
+            connection.connection.dbapi_connection.executescript(
+                f"PRAGMA incremental_vacuum({int(max_pages)})"
+            )
+        after = connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+    return before - after
+
+def run_retention(
+    engine,
+    ttl_days: int = HISTORY_TTL_DAYS,
+    batch_size: int = BATCH_SIZE,
+    vacuum_pages: int = VACUUM_PAGES,
+    stop: Optional[threading.Event] = None,
+) -> Dict[str, Any]:
+    """Roll up and delete history older than ``ttl_days`` in small batches, then vacuum."""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=ttl_days)
+    expired = (
+        select(WeatherHistory.id)
+        .where(WeatherHistory.created_at < cutoff)
+        .order_by(WeatherHistory.created_at)
+        .limit(batch_size)
+    )
+
+    deleted = 0
+    with query_scope("weather_app-retention"):
+        while stop is None or not stop.is_set():
+            with engine.begin() as connection:
+                ids = connection.execute(expired).scalars().all()
+                if not ids:
+                    break
+                connection.execute(_rollup_statement(ids, now))
+                connection.execute(delete(WeatherHistory).where(WeatherHistory.id.in_(ids)))
+            deleted += len(ids)
+            time.sleep(BATCH_PAUSE)
+
+        pages = incremental_vacuum(engine, vacuum_pages) if deleted else 0
+
+    if deleted:
+        logger.info("Weather history retention: rolled up and deleted %s rows, freed %s pages", deleted, pages)
+    return {"deleted": deleted, "pages_freed": pages, "cutoff": cutoff.isoformat()}
+
+class RetentionWorker:
+    """Daemon thread that runs retention periodically, off the request path."""
+
+    def __init__(self, engine, interval: float = RETENTION_INTERVAL, ttl_days: int = HISTORY_TTL_DAYS):
+        self.engine = engine
+        self.interval = interval
+        self.ttl_days = ttl_days
+        self.last_run: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="weather-retention", daemon=True)
+
+    def start(self) -> "RetentionWorker":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.last_run = run_retention(self.engine, self.ttl_days, stop=self._stop)
+            except Exception:
+                logger.exception("Weather history retention failed")
+            self._stop.wait(self.interval)
+
+_worker: Optional[RetentionWorker] = None
+
+def start_retention_worker(engine) -> RetentionWorker:
+    """Start the process-wide retention worker once."""
+    global _worker
+    if _worker is None:
+        _worker = RetentionWorker(engine).start()
+    return _worker
+
+def stop_retention_worker() -> None:
+    """Stop the process-wide retention worker, waiting briefly for a running batch."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+@asynccontextmanager
+async def retention_lifespan(engine):
+    """App lifespan task that runs the retention worker while the server is up.
+
+    Starting it here rather than at import keeps ``reflex export`` and other
+    imports of the app from touching the database in the background.
+    """
+    start_retention_worker(engine)
+    try:
+        yield
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, stop_retention_worker)
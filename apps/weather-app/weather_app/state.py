@@ -1,11 +1,34 @@
 """State management for Weather App."""
 
 import reflex as rx
+import sys
+import os
 import asyncio
+import math
 from typing import List, Dict, Any, Optional
-from .database import get_db_session, init_db
-from .models import WeatherHistory, SavedLocation
-from .weather_service import WeatherService
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.database import fetch_dicts, rows_to_dicts
+from shared.instrumentation import track_queries
+from shared.rate_limit import RateLimited
+from . import writes
+from .database import async_unit_of_work, unit_of_work, write_queue
+from .models import SavedLocation
+from .queries import (
+    recent_weather_history,
+    list_saved_locations,
+    saved_location_by_id,
+    saved_location_exists,
+)
+from .weather_service import weather_service
+
+def _busy_message(error: RateLimited) -> str:
+    """User-facing text for a lookup refused by the API quota."""
+    return f"Weather lookups are busy right now. Please try again in {math.ceil(error.retry_after)} seconds."
+
+def _queued_message(wait: float) -> str:
+    """User-facing text for a lookup waiting its turn for API quota."""
+    return f"Weather lookups are busy; yours is queued and should start in about {math.ceil(wait)} seconds..."
 
 class WeatherState(rx.State):
     """State for managing weather data."""
@@ -15,6 +38,8 @@ class WeatherState(rx.State):
     saved_locations: List[Dict[str, Any]] = []
     search_city: str = ""
     is_loading: bool = False
+    # Expected wait for API quota, shown while a lookup is queued.
+    wait_message: str = ""
     error_message: str = ""
     success_message: str = ""
     current_view: str = "current"  # current, forecast, history, locations
@@ -22,60 +47,79 @@ class WeatherState(rx.State):
     
     def __init__(self):
         super().__init__()
-        self.weather_service = WeatherService()
-        self.load_saved_locations()
-        self.load_weather_history()
+        with unit_of_work():
+            self.load_saved_locations()
+            self.load_weather_history()
     
+    @track_queries()
     def load_saved_locations(self):
         """Load saved locations from database."""
         try:
-            init_db()
-            db = get_db_session()
-            locations = db.query(SavedLocation).order_by(SavedLocation.created_at.desc()).all()
-            self.saved_locations = [location.to_dict() for location in locations]
-            db.close()
+            with unit_of_work() as db:
+                self.saved_locations = fetch_dicts(db.connection(), list_saved_locations())
         except Exception as e:
             self.error_message = f"Failed to load saved locations: {str(e)}"
     
+    @track_queries()
     def load_weather_history(self):
         """Load weather history from database."""
         try:
-            db = get_db_session()
-            history = db.query(WeatherHistory).order_by(WeatherHistory.created_at.desc()).limit(20).all()
-            self.weather_history = [record.to_dict() for record in history]
-            db.close()
+            with unit_of_work() as db:
+                self.weather_history = fetch_dicts(db.connection(), recent_weather_history())
         except Exception as e:
             self.error_message = f"Failed to load weather history: {str(e)}"
     
+    async def _refresh_saved_locations(self):
+        """Reload saved locations without blocking the event loop."""
+        async with async_unit_of_work() as db:
+            connection = await db.connection()
+            self.saved_locations = rows_to_dicts(await connection.execute(list_saved_locations()))
+    
+    async def _refresh_weather_history(self):
+        """Reload weather history without blocking the event loop."""
+        async with async_unit_of_work() as db:
+            connection = await db.connection()
+            self.weather_history = rows_to_dicts(await connection.execute(recent_weather_history()))
+    
+    @track_queries()
     async def search_weather(self):
-        """Search weather for a city."""
+        """Search weather for a city, first showing the expected wait if it is queued for quota."""
         if not self.search_city.strip():
             self.error_message = "Please enter a city name"
             return
         
+        city = self.search_city.strip()
         try:
             self.is_loading = True
             self.error_message = ""
+            wait = weather_service.current_weather_wait(city)
+            if wait >= 1:
+                self.wait_message = _queued_message(wait)
+            yield
             
             # Fetch current weather
-            raw_data = await self.weather_service.get_current_weather(self.search_city.strip())
-            weather_data = self.weather_service.parse_weather_data(raw_data)
+            raw_data = await weather_service.get_current_weather(city)
+            weather_data = weather_service.parse_weather_data(raw_data)
             self.current_weather = weather_data
             
             # Save to history
-            self.save_weather_to_history(weather_data)
+            await self.save_weather_to_history(weather_data)
             
             self.success_message = f"Weather data loaded for {weather_data['city']}"
             self.current_view = "current"
             
+        except RateLimited as e:
+            # Keep showing what is already loaded; the lookup can simply be retried.
+            self.error_message = _busy_message(e)
         except Exception as e:
             self.error_message = f"Failed to fetch weather: {str(e)}"
             self.current_weather = {}
         finally:
             self.is_loading = False
+            self.wait_message = ""
     
     async def get_forecast(self):
-        """Get weather forecast for current city."""
+        """Get weather forecast for current city, first showing the expected wait if it is queued for quota."""
         if not self.current_weather.get("city"):
             self.error_message = "Please search for a city first"
             return
@@ -83,8 +127,12 @@ class WeatherState(rx.State):
         try:
             self.is_loading = True
             self.error_message = ""
+            wait = weather_service.forecast_wait(self.current_weather["city"])
+            if wait >= 1:
+                self.wait_message = _queued_message(wait)
+            yield
             
-            raw_forecast = await self.weather_service.get_forecast(self.current_weather["city"])
+            raw_forecast = await weather_service.get_forecast(self.current_weather["city"])
             
             # Parse forecast data (daily summary)
             daily_forecast = []
@@ -106,100 +154,84 @@ class WeatherState(rx.State):
             self.current_view = "forecast"
             self.success_message = f"Forecast loaded for {self.current_weather['city']}"
             
+        except RateLimited as e:
+            self.error_message = _busy_message(e)
         except Exception as e:
             self.error_message = f"Failed to fetch forecast: {str(e)}"
             self.forecast_data = []
         finally:
             self.is_loading = False
+            self.wait_message = ""
     
-    def save_weather_to_history(self, weather_data: Dict[str, Any]):
+    @track_queries()
+    async def save_weather_to_history(self, weather_data: Dict[str, Any]):
         """Save weather data to history."""
         try:
-            db = get_db_session()
-            
-            history_record = WeatherHistory(
-                city=weather_data["city"],
-                country=weather_data["country"],
-                temperature=weather_data["temperature"],
-                feels_like=weather_data["feels_like"],
-                humidity=weather_data["humidity"],
-                pressure=weather_data["pressure"],
-                wind_speed=weather_data["wind_speed"],
-                wind_direction=weather_data["wind_direction"],
-                weather_main=weather_data["weather_main"],
-                weather_description=weather_data["weather_description"],
-                icon=weather_data["icon"],
-                timezone=weather_data["timezone"],
-            )
-            
-            db.add(history_record)
-            db.commit()
+            await write_queue.submit_async(writes.insert_weather_history, weather_data)
             
             # Reload history
-            self.load_weather_history()
-            
-            db.close()
+            await self._refresh_weather_history()
         except Exception as e:
             print(f"Failed to save weather history: {str(e)}")
     
-    def save_current_location(self):
+    @track_queries()
+    async def save_current_location(self):
         """Save current weather location to saved locations."""
         if not self.current_weather.get("city"):
             self.error_message = "No current weather data to save"
             return
         
         try:
-            db = get_db_session()
-            
-            # Check if location already exists
-            existing = db.query(SavedLocation).filter(
-                SavedLocation.city == self.current_weather["city"],
-                SavedLocation.country == self.current_weather["country"]
-            ).first()
-            
-            if existing:
-                self.error_message = "Location already saved"
-                db.close()
-                return
-            
-            saved_location = SavedLocation(
-                city=self.current_weather["city"],
-                country=self.current_weather["country"],
-                latitude=self.current_weather["latitude"],
-                longitude=self.current_weather["longitude"],
-                nickname=self.current_weather["city"],
-            )
+            async with async_unit_of_work() as db:
+                # Check if location already exists
+                result = await db.execute(
+                    saved_location_exists(self.current_weather["city"], self.current_weather["country"])
+                )
+                
+                if result.first():
+                    self.error_message = "Location already saved"
+                    return
+                
+                saved_location = SavedLocation(
+                    city=self.current_weather["city"],
+                    country=self.current_weather["country"],
+                    latitude=self.current_weather["latitude"],
+                    longitude=self.current_weather["longitude"],
+                    nickname=self.current_weather["city"],
+                )
+                
+                db.add(saved_location)
+                await db.flush()
+                
+                # Reuses this session, so the reload sees the new row before the commit
+                await self._refresh_saved_locations()
             
-            db.add(saved_location)
-            db.commit()
-            
-            self.load_saved_locations()
             self.success_message = f"Location {self.current_weather['city']} saved!"
-            
-            db.close()
         except Exception as e:
             self.error_message = f"Failed to save location: {str(e)}"
     
-    def delete_saved_location(self, location_id: int):
+    @track_queries()
+    async def delete_saved_location(self, location_id: int):
         """Delete a saved location."""
         try:
-            db = get_db_session()
-            location = db.query(SavedLocation).filter(SavedLocation.id == location_id).first()
+            async with async_unit_of_work() as db:
+                result = await db.execute(saved_location_by_id(location_id))
+                location = result.scalar_one_or_none()
+                
+                if location:
+                    await db.delete(location)
+                    await db.flush()
+                    await self._refresh_saved_locations()
             
             if location:
-                db.delete(location)
-                db.commit()
-                self.load_saved_locations()
                 self.success_message = "Location deleted successfully!"
-            
-            db.close()
         except Exception as e:
             self.error_message = f"Failed to delete location: {str(e)}"
     
-    async def load_weather_for_location(self, city: str):
+    def load_weather_for_location(self, city: str):
         """Load weather for a saved location."""
         self.search_city = city
-        await self.search_weather()
+        return WeatherState.search_weather
     
     def set_search_city(self, city: str):
         """Set search city."""
@@ -224,12 +256,12 @@ class WeatherState(rx.State):
     def weather_icon_url(self) -> str:
         """Get weather icon URL."""
         if self.current_weather.get("icon"):
-            return self.weather_service.get_weather_icon_url(self.current_weather["icon"])
+            return weather_service.get_weather_icon_url(self.current_weather["icon"])
         return ""
     
     @rx.var
     def wind_direction_name(self) -> str:
         """Get wind direction name."""
         if self.current_weather.get("wind_direction"):
-            return self.weather_service.get_wind_direction_name(self.current_weather["wind_direction"])
+            return weather_service.get_wind_direction_name(self.current_weather["wind_direction"])
         return "N/A"
\ No newline at end of file
@@ -6,8 +6,13 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
 from shared.components import page_header, navigation_bar, error_message, success_message
+from shared.database import schema_lifespan
+from shared.http_client import http_clients_lifespan
 from shared.theme import get_base_style, DARK_THEME
+from .database import engine, init_db
+from .retention import enable_incremental_vacuum, retention_lifespan
 from .state import WeatherState
+from .weather_service import WARM_UP, warm_up_cache
 from .components import (
     weather_search,
     weather_navigation,
@@ -17,6 +22,12 @@ from .components import (
     saved_locations
 )
 
+def prepare_database() -> int:
+    """Give a new database incremental auto-vacuum, then apply pending migrations."""
+    # Auto-vacuum has to be set before the first table is created.
+    enable_incremental_vacuum(engine)
+    return init_db()
+
 def index() -> rx.Component:
     """Main page of the Weather App."""
     return rx.box(
@@ -69,6 +80,15 @@ app = rx.App(
     }
 )
 
+# Apply pending schema migrations once at server startup, before the tasks below use it.
+app.register_lifespan_task(schema_lifespan, init_db=prepare_database)
+# Roll up and prune old weather history in the background while the server runs.
+app.register_lifespan_task(retention_lifespan, engine=engine)
+# Close the shared OpenWeatherMap client's pooled connections on shutdown.
+app.register_lifespan_task(http_clients_lifespan)
+if WARM_UP:
+    app.register_lifespan_task(warm_up_cache)
+
 app.add_page(index, route="/")
 
 if __name__ == "__main__":
@@ -1,71 +1,302 @@
 """Weather service for OpenWeatherMap API integration."""
 
-import httpx
+import asyncio
+import logging
+import sys
 import os
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Any, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../packages"))
+from shared.http_client import get_http_client
+from shared.rate_limit import BACKGROUND, INTERACTIVE, RateLimited, RateLimiter, current_priority, request_priority
+from .database import async_unit_of_work
+from .queries import list_saved_locations
+from .response_store import PERSISTENT_CACHE_MB, ResponseStore
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Seconds a response is served without asking the API again.
+CURRENT_TTL = float(os.getenv("WEATHER_CACHE_CURRENT_TTL", "600"))
+FORECAST_TTL = float(os.getenv("WEATHER_CACHE_FORECAST_TTL", "1800"))
+# Seconds past its TTL that a response is still served while a refresh runs.
+STALE_TTL = float(os.getenv("WEATHER_CACHE_STALE_TTL", "600"))
+# Most responses kept; the least recently used are evicted first. 0 turns caching off.
+CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "512"))
+# Coordinates are rounded to this many decimals (about 1 km) before caching.
+COORDINATE_PRECISION = 2
+# OpenWeatherMap's free plan allows 60 calls a minute and 1,000,000 a month.
+CALLS_PER_MINUTE = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60"))
+CALLS_PER_DAY = int(os.getenv("OPENWEATHER_CALLS_PER_DAY", "32000"))
+# A search that would queue longer than this for quota fails at once instead.
+MAX_INTERACTIVE_WAIT = float(os.getenv("OPENWEATHER_MAX_WAIT", "10"))
+# Back-off after a 429 that carries no Retry-After header.
+DEFAULT_RETRY_AFTER = 60.0
+# Fill the cache for every saved location when the app starts.
+WARM_UP = os.getenv("WEATHER_CACHE_WARMUP", "false").lower() in ("1", "true", "yes", "on")
+# Saved locations looked up at once while warming up.
+WARM_UP_CONCURRENCY = 4
+
+CacheKey = Tuple[Any, ...]
+
+class CachedResponse(NamedTuple):
+    """A decoded API response and when it was fetched (seconds since the epoch)."""
+    data: Dict[str, Any]
+    fetched_at: float
+
+def cache_key(path: str, params: Dict[str, Any]) -> CacheKey:
+    """Key for a request that ignores case, spacing and coordinate noise."""
+    normalized = []
+    for name, value in sorted(params.items()):
+        if name in ("lat", "lon"):
+            value = round(float(value), COORDINATE_PRECISION)
+        elif isinstance(value, str):
+            value = ",".join(" ".join(part.split()).casefold() for part in value.split(","))
+        normalized.append((name, value))
+    return (path, *normalized)
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same key.
+
+    Every waiter gets the result, or the exception, of the one call. Nothing is
+    kept once the call finishes. A waiter that is cancelled leaves the call
+    running for the others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[CacheKey, asyncio.Future] = {}
+        self.calls = 0
+        self.joined = 0
+
+    async def do(self, key: CacheKey, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Await ``fetch()``, or the call already running for ``key``."""
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = self._flights[key] = asyncio.ensure_future(fetch())
+            flight.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.joined += 1
+        return await asyncio.shield(flight)
+
+    def stats(self) -> Dict[str, int]:
+        """Upstream calls made, callers that joined one, and calls in flight."""
+        return {"calls": self.calls, "joined": self.joined, "in_flight": len(self._flights)}
+
+    def _land(self, key: CacheKey, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Marks the exception retrieved even if every waiter was cancelled.
+            flight.exception()
+
+class ResponseCache:
+    """Bounded LRU of API responses with stale-while-revalidate.
+
+    A response younger than its TTL is a hit. One up to ``stale_ttl`` past it is
+    still returned at once, and a single background refresh replaces it. Anything
+    older is a miss and is fetched before returning. Cached dicts are shared by
+    every caller and must not be modified.
+
+    With a ``store``, a key missing from memory is looked up there before it
+    counts as a miss, and every fetched response is saved to it, so the cache
+    survives restarts.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE, stale_ttl: float = STALE_TTL, store: Optional[ResponseStore] = None):
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.store = store
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._refreshing: Dict[CacheKey, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+    async def get(
+        self, key: CacheKey, ttl: float, fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached response for ``key``, calling ``fetch`` when it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None and self.store is not None:
+            entry = await self._load(key)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.data
+            if age < ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, fetch)
+                return entry.data
+        
+        self.misses += 1
+        data = await fetch()
+        self._store(key, data)
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since startup."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def servable(self, key: CacheKey, ttl: float) -> bool:
+        """Whether ``get`` would answer ``key`` from memory without waiting on a fetch."""
+        entry = self._entries.get(key)
+        return entry is not None and time.time() - entry.fetched_at < ttl + self.stale_ttl
+
+    def _store(self, key: CacheKey, data: Dict[str, Any]) -> None:
+        entry = self._remember(key, CachedResponse(data, time.time()))
+        if self.store is not None:
+            self.store.save(key, entry.data, entry.fetched_at)
+
+    def _remember(self, key: CacheKey, entry: CachedResponse) -> CachedResponse:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    async def _load(self, key: CacheKey) -> Optional[CachedResponse]:
+        try:
+            stored = await self.store.load(key)
+        except Exception as e:
+            logger.warning("Failed to read persisted weather %s: %s", key, e)
+            return None
+        # Another caller may have fetched it while this one read the disk.
+        if stored is None or key in self._entries:
+            return self._entries.get(key)
+        return self._remember(key, CachedResponse(*stored))
+
+    def _refresh(self, key: CacheKey, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        if key in self._refreshing:
+            return
+        
+        async def refresh():
+            try:
+                with request_priority(BACKGROUND):
+                    data = await fetch()
+                self._store(key, data)
+                self.refreshes += 1
+            except Exception as e:
+                # Keep serving the stale response until it ages out.
+                self.refresh_failures += 1
+                logger.warning("Failed to refresh cached weather %s: %s", key, e)
+            finally:
+                del self._refreshing[key]
+        
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+def _retry_after(header: Optional[str]) -> float:
+    """Seconds to back off from a Retry-After header given in seconds."""
+    try:
+        return max(1.0, float(header))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+# Shared by every session in the process, so the budgets cover all of them.
+openweather_limiter = RateLimiter({
+    "minute": (CALLS_PER_MINUTE, 60.0),
+    "day": (CALLS_PER_DAY, 86400.0),
+})
+
 class WeatherService:
     """Service for fetching weather data from OpenWeatherMap API."""
     
     def __init__(self):
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
-        self.base_url = "https://api.openweathermap.org/data/2.5"
-        
-    async def get_current_weather(self, city: str) -> Dict[str, Any]:
-        """Get current weather for a city."""
+        self.base_url = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5")
+        store = ResponseStore() if PERSISTENT_CACHE_MB > 0 else None
+        self.cache = ResponseCache(store=store) if CACHE_SIZE > 0 else None
+        self.flights = SingleFlight()
+        self.limiter: Optional[RateLimiter] = openweather_limiter
+    
+    async def _get(self, path: str, params: Dict[str, Any], ttl: float) -> Dict[str, Any]:
+        """GET an API endpoint through the response cache, sharing identical calls in flight."""
         if not self.api_key:
             raise ValueError("OpenWeatherMap API key not found. Please set OPENWEATHER_API_KEY environment variable.")
         
-        url = f"{self.base_url}/weather"
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": "metric"
-        }
+        params = {**params, "units": "metric"}
+        key = cache_key(path, params)
+        fetch = lambda: self.flights.do(key, lambda: self._fetch(path, params))
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.get(key, ttl, fetch)
+    
+    async def _fetch(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET an API endpoint over the app's shared keep-alive client, within the rate limits."""
+        if self.limiter is not None:
+            interactive = current_priority() == INTERACTIVE
+            await self.limiter.acquire(max_wait=MAX_INTERACTIVE_WAIT if interactive else None)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client("weather_app")
+        response = await client.get(f"{self.base_url}/{path}", params={**params, "appid": self.api_key})
+        if response.status_code == 429:
+            retry_after = _retry_after(response.headers.get("Retry-After"))
+            if self.limiter is not None:
+                self.limiter.penalize(retry_after)
+            raise RateLimited(retry_after, "OpenWeatherMap rate limit reached")
+        response.raise_for_status()
+        return response.json()
+        
+    def estimate_wait(self, path: str, params: Dict[str, Any], ttl: float) -> float:
+        """Seconds a lookup made now would queue for API quota; 0 if memory can answer it."""
+        if self.limiter is None:
+            return 0.0
+        if self.cache is not None and self.cache.servable(cache_key(path, {**params, "units": "metric"}), ttl):
+            return 0.0
+        return self.limiter.estimate_wait()
+    
+    def current_weather_wait(self, city: str) -> float:
+        """Expected queueing before get_current_weather(city) reaches the API."""
+        return self.estimate_wait("weather", {"q": city}, CURRENT_TTL)
+    
+    def forecast_wait(self, city: str, days: int = 5) -> float:
+        """Expected queueing before get_forecast(city, days) reaches the API."""
+        return self.estimate_wait("forecast", {"q": city, "cnt": days * 8}, FORECAST_TTL)
+    
+    async def get_current_weather(self, city: str) -> Dict[str, Any]:
+        """Get current weather for a city."""
+        return await self._get("weather", {"q": city}, CURRENT_TTL)
     
     async def get_weather_by_coordinates(self, lat: float, lon: float) -> Dict[str, Any]:
         """Get current weather by coordinates."""
-        if not self.api_key:
-            raise ValueError("OpenWeatherMap API key not found. Please set OPENWEATHER_API_KEY environment variable.")
-        
-        url = f"{self.base_url}/weather"
-        params = {
-            "lat": lat,
-            "lon": lon,
-            "appid": self.api_key,
-            "units": "metric"
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(
+            "weather",
+            {"lat": round(lat, COORDINATE_PRECISION), "lon": round(lon, COORDINATE_PRECISION)},
+            CURRENT_TTL,
+        )
     
     async def get_forecast(self, city: str, days: int = 5) -> Dict[str, Any]:
         """Get weather forecast for a city."""
-        if not self.api_key:
-            raise ValueError("OpenWeatherMap API key not found. Please set OPENWEATHER_API_KEY environment variable.")
-        
-        url = f"{self.base_url}/forecast"
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": "metric",
-            "cnt": days * 8  # 8 forecasts per day (every 3 hours)
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(
+            "forecast",
+            {
+                "q": city,
+                "cnt": days * 8  # 8 forecasts per day (every 3 hours)
+            },
+            FORECAST_TTL,
+        )
     
     def parse_weather_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse OpenWeatherMap API response into clean format."""
@@ -103,4 +334,32 @@ class WeatherService:
         ]
         
         index = round(degrees / 22.5) % 16
-        return directions[index]
\ No newline at end of file
+        return directions[index]
+
+# One service per process; it holds no per-session state.
+weather_service = WeatherService()
+
+async def warm_up_cache() -> None:
+    """Look up current weather for every saved location, so their first searches are hits.
+
+    Responses still fresh in the persistent cache are loaded from disk rather than
+    fetched. Runs as an app lifespan task when WEATHER_CACHE_WARMUP is set.
+    """
+    async with async_unit_of_work() as db:
+        connection = await db.connection()
+        cities = sorted({row.city for row in await connection.execute(list_saved_locations())})
+    
+    semaphore = asyncio.Semaphore(WARM_UP_CONCURRENCY)
+    
+    async def warm(city: str) -> bool:
+        async with semaphore:
+            try:
+                await weather_service.get_current_weather(city)
+                return True
+            except Exception as e:
+                logger.warning("Could not warm weather cache for %s: %s", city, e)
+                return False
+    
+    with request_priority(BACKGROUND):
+        warmed = await asyncio.gather(*(warm(city) for city in cities))
+    logger.info("Warmed weather cache for %s of %s saved locations", sum(warmed), len(cities))
\ No newline at end of file
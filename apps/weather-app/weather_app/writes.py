@@ -0,0 +1,57 @@
+"""Write intents for the Weather App, run on the shared write queue."""
+
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .models import WeatherHistory, WeatherResponse
+
+def insert_weather_history(db: Session, weather_data: Dict[str, Any]) -> None:
+    """Record a weather lookup in the search history."""
+    db.add(WeatherHistory(
+        city=weather_data["city"],
+        country=weather_data["country"],
+        temperature=weather_data["temperature"],
+        feels_like=weather_data["feels_like"],
+        humidity=weather_data["humidity"],
+        pressure=weather_data["pressure"],
+        wind_speed=weather_data["wind_speed"],
+        wind_direction=weather_data["wind_direction"],
+        weather_main=weather_data["weather_main"],
+        weather_description=weather_data["weather_description"],
+        icon=weather_data["icon"],
+        timezone=weather_data["timezone"],
+    ))
+
+def save_weather_response(
+    db: Session, cache_key: str, endpoint: str, payload: str, fetched_at: float, max_bytes: int
+) -> int:
+    """Upsert a raw API payload, then evict the oldest ones past ``max_bytes``; return how many."""
+    now = datetime.utcnow()
+    size = len(payload.encode())
+    stmt = sqlite_insert(WeatherResponse).values(
+        cache_key=cache_key,
+        endpoint=endpoint,
+        payload=payload,
+        size=size,
+        fetched_at=fetched_at,
+        created_at=now,
+        updated_at=now,
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["cache_key"],
+        set_={"payload": payload, "size": size, "fetched_at": fetched_at, "updated_at": now},
+    ))
+    
+    newest_first = select(
+        WeatherResponse.id,
+        func.sum(WeatherResponse.size).over(order_by=WeatherResponse.fetched_at.desc()).label("total"),
+    ).subquery()
+    result = db.execute(
+        delete(WeatherResponse).where(
+            WeatherResponse.id.in_(select(newest_first.c.id).where(newest_first.c.total > max_bytes))
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
\ No newline at end of file
@@ -1,37 +1,561 @@
 """Shared database utilities using SQLAlchemy and SQLite."""
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import (
+    create_engine,
+    event,
+    func,
+    insert,
+    select,
+    Column,
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    MetaData,
+    Table,
+    Text,
+    type_coerce,
+)
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+import asyncio
+import logging
 import os
+import re
+import threading
+import time
+
+from .instrumentation import instrument_engine, recorder
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Production defaults applied to every new SQLite connection. busy_timeout goes
+# first so the journal_mode switch can wait out a concurrent writer.
+SQLITE_PRAGMA_DEFAULTS: Dict[str, Any] = {
+    "busy_timeout": 5000,  # milliseconds
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,  # 256 MiB
+    "cache_size": -65536,  # negative means KiB, so 64 MiB
+    "temp_store": "MEMORY",
+}
+
+# Connection pool defaults, overridable through DB_POOL_* environment variables.
+POOL_DEFAULTS: Dict[str, Any] = {
+    "size": 5,
+    "max_overflow": 10,
+    "timeout": 30,  # seconds to wait for a connection before giving up
+    "recycle": 3600,  # seconds before a pooled connection is reopened
+    "pre_ping": False,
+}
+
+_PRAGMA_VALUE_RE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+# Bookkeeping table, kept out of Base.metadata so create_all never touches it.
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow, nullable=False),
+)
+
+_engines: Dict[str, Any] = {}
+_async_engines: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+_schema_versions: Dict[str, int] = {}
+_schema_lock = threading.Lock()
+
 def get_database_url(app_name: str) -> str:
     """Get database URL for the given app."""
     db_dir = os.path.join(os.getcwd(), "data")
     os.makedirs(db_dir, exist_ok=True)
     return f"sqlite:///{db_dir}/{app_name}.db"
 
-def create_database_engine(app_name: str):
-    """Create database engine for the given app."""
+def get_async_database_url(app_name: str) -> str:
+    """Get aiosqlite database URL for the given app."""
+    return get_database_url(app_name).replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+def _resolve_settings(app_name: str, prefix: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay ``<PREFIX><NAME>`` and ``<APP_NAME>_<PREFIX><NAME>`` environment variables on defaults."""
+    settings = dict(defaults)
+    for env_prefix in (prefix, f"{app_name.upper()}_{prefix}"):
+        for name in defaults:
+            value = os.getenv(f"{env_prefix}{name.upper()}")
+            if value:
+                settings[name] = value
+    return settings
+
+def get_sqlite_pragmas(app_name: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get the SQLite tuning profile for the given app.
+
+    Values are resolved from the defaults, then ``SQLITE_<PRAGMA>`` environment
+    variables, then ``<APP_NAME>_SQLITE_<PRAGMA>`` ones, then ``overrides``.
+    """
+    pragmas = _resolve_settings(app_name, "SQLITE_", SQLITE_PRAGMA_DEFAULTS)
+    if overrides:
+        pragmas.update(overrides)
+
+    for name, value in pragmas.items():
+        if not _PRAGMA_VALUE_RE.match(str(value)):
+            raise ValueError(f"Invalid value for SQLite pragma {name}: {value!r}")
+    return pragmas
+
+def get_pool_settings(app_name: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get connection pool settings, resolved like the pragmas with a ``DB_POOL_`` prefix."""
+    settings = _resolve_settings(app_name, "DB_POOL_", POOL_DEFAULTS)
+    if overrides:
+        settings.update(overrides)
+    for name in ("size", "max_overflow", "timeout", "recycle"):
+        settings[name] = int(settings[name])
+    if isinstance(settings["pre_ping"], str):
+        settings["pre_ping"] = settings["pre_ping"].lower() in ("1", "true", "yes", "on")
+    return settings
+
+class _WaitTimingMixin:
+    """Record how long callers wait to check a connection out of the pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and checkout wait times."""
+        with self._stats_lock:
+            checkouts = self.checkouts
+            wait_total = self.wait_time_total
+            wait_max = self.wait_time_max
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": checkouts,
+            "wait_time_total": wait_total,
+            "wait_time_avg": wait_total / checkouts if checkouts else 0.0,
+            "wait_time_max": wait_max,
+        }
+
+class TimedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool that tracks checkout wait time."""
+
+class TimedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that tracks checkout wait time."""
+
+def _pool_kwargs(settings: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "pool_size": settings["size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["timeout"],
+        "pool_recycle": settings["recycle"],
+        "pool_pre_ping": settings["pre_ping"],
+    }
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]) -> None:
+    """Apply pragmas to a raw SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def read_sqlite_pragmas(dbapi_connection, names) -> Dict[str, Any]:
+    """Read the effective value of each pragma from a raw SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        effective = {}
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            effective[name] = row[0] if row else None
+        return effective
+    finally:
+        cursor.close()
+
+def install_sqlite_pragmas(engine, app_name: str, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """Apply the app's SQLite tuning profile on every new connection of a sync engine."""
+    pragmas = get_sqlite_pragmas(app_name) if pragmas is None else pragmas
+    logged = []
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        if not logged:
+            logged.append(True)
+            effective = read_sqlite_pragmas(dbapi_connection, pragmas)
+            logger.info(
+                "SQLite pragmas for %s (%s): %s",
+                app_name,
+                engine.dialect.driver,
+                ", ".join(f"{name}={value}" for name, value in effective.items()),
+            )
+
+def create_database_engine(
+    app_name: str,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool: Optional[Dict[str, Any]] = None,
+):
+    """Create database engine for the given app.
+
+    Prefer get_engine, which hands out a single shared engine per app.
+    """
     database_url = get_database_url(app_name)
     engine = create_engine(
         database_url,
         connect_args={"check_same_thread": False},
-        echo=False
+        echo=False,
+        poolclass=TimedQueuePool,
+        **_pool_kwargs(get_pool_settings(app_name, pool)),
+    )
+    install_sqlite_pragmas(engine, app_name, pragmas)
+    instrument_engine(engine)
+    return engine
+
+def create_async_database_engine(
+    app_name: str,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool: Optional[Dict[str, Any]] = None,
+):
+    """Create aiosqlite-backed async database engine for the given app.
+
+    Prefer get_async_engine, which hands out a single shared engine per app.
+    """
+    engine = create_async_engine(
+        get_async_database_url(app_name),
+        echo=False,
+        poolclass=TimedAsyncQueuePool,
+        **_pool_kwargs(get_pool_settings(app_name, pool)),
     )
+    install_sqlite_pragmas(engine.sync_engine, app_name, pragmas)
+    instrument_engine(engine.sync_engine)
     return engine
 
+def get_engine(app_name: str):
+    """Get the process-wide pooled engine for the given app, creating it on first use."""
+    with _registry_lock:
+        engine = _engines.get(app_name)
+        if engine is None:
+            engine = _engines[app_name] = create_database_engine(app_name)
+        return engine
+
+def get_async_engine(app_name: str):
+    """Get the process-wide pooled async engine for the given app, creating it on first use."""
+    with _registry_lock:
+        engine = _async_engines.get(app_name)
+        if engine is None:
+            engine = _async_engines[app_name] = create_async_database_engine(app_name)
+        return engine
+
+def get_pool_stats(app_name: str) -> Dict[str, Dict[str, Any]]:
+    """Get pool statistics for each registered engine of the given app."""
+    stats = {}
+    if app_name in _engines:
+        stats["sync"] = _engines[app_name].pool.stats()
+    if app_name in _async_engines:
+        stats["async"] = _async_engines[app_name].sync_engine.pool.stats()
+    return stats
+
+async def dispose_engines() -> None:
+    """Close every pooled connection held by the registry, e.g. on shutdown."""
+    with _registry_lock:
+        engines = list(_engines.values())
+        async_engines = list(_async_engines.values())
+        _engines.clear()
+        _async_engines.clear()
+    for engine in engines:
+        engine.dispose()
+    for engine in async_engines:
+        await engine.dispose()
+
 def get_session_maker(engine):
     """Get session maker for database operations."""
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_session_maker(engine):
+    """Get async session maker for database operations inside async event handlers."""
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+_units_of_work: ContextVar[Optional[Dict[Any, "UnitOfWork"]]] = ContextVar("units_of_work", default=None)
+
+class UnitOfWork:
+    """One session shared by everything that runs inside an event.
+
+    Use it as ``with`` for a sessionmaker or ``async with`` for an async one. The
+    outermost block owns the session: nested blocks for the same session maker,
+    such as a helper called from a handler, get that session instead of opening
+    another. When the outermost block exits, the session is committed once (or
+    rolled back if the block raised) and always closed, which returns its
+    connection to the pool. The time the connection was held, from the first
+    statement to the close, is reported to the current query scope as
+    ``hold_time``.
+    """
+
+    def __init__(self, session_maker, name: Optional[str] = None):
+        self.session_maker = session_maker
+        self.name = name or "unit_of_work"
+        self.session = None
+        self.hold_time = 0.0
+        self._began_at: Optional[float] = None
+        self._token = None
+
+    def __enter__(self):
+        return self._open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is None:
+            return
+        try:
+            if exc_type is None and self.session.in_transaction():
+                self.session.commit()
+        finally:
+            self.session.close()
+            self._finish()
+
+    async def __aenter__(self):
+        return self._open()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._token is None:
+            return
+        try:
+            if exc_type is None and self.session.in_transaction():
+                await self.session.commit()
+        finally:
+            await self.session.close()
+            self._finish()
+
+    def _open(self):
+        units = _units_of_work.get() or {}
+        outer = units.get(self.session_maker)
+        if outer is not None:
+            self.session = outer.session
+            return self.session
+
+        self.session = self.session_maker()
+        # Sessions check out a connection when their first transaction begins.
+        event.listen(getattr(self.session, "sync_session", self.session), "after_begin", self._on_begin)
+        self._token = _units_of_work.set({**units, self.session_maker: self})
+        return self.session
+
+    def _on_begin(self, session, transaction, connection) -> None:
+        if self._began_at is None:
+            self._began_at = time.perf_counter()
+
+    def _finish(self) -> None:
+        _units_of_work.reset(self._token)
+        self._token = None
+        if self._began_at is not None:
+            self.hold_time = time.perf_counter() - self._began_at
+            recorder.record_hold(self.name, self.hold_time)
+
+def unit_of_work(session_maker, name: Optional[str] = None) -> UnitOfWork:
+    """Share one session per event for ``session_maker``; see UnitOfWork."""
+    return UnitOfWork(session_maker, name)
+
+class Migration(NamedTuple):
+    """A numbered schema change applied inside its own transaction."""
+    version: int
+    description: str
+    upgrade: Callable[[Any], None]
+
+def _declared_indexes(models, names: Iterable[str]) -> List[Any]:
+    declared = {index.name: index for model in models for index in model.__table__.indexes}
+    missing = [name for name in names if name not in declared]
+    if missing:
+        raise ValueError(f"No index named {', '.join(missing)} is declared on the given models")
+    return [declared[name] for name in names]
+
+def create_tables(*models, indexes: Iterable[str] = ()) -> Callable[[Any], None]:
+    """Migration step that creates the tables of the given models, and the named indexes, if missing.
+
+    Indexes the models declare but the step does not name are left to later
+    migrations, so the step keeps doing what it did when it was written.
+    """
+    indexes = tuple(indexes)
+
+    def upgrade(connection):
+        for model in models:
+            connection.execute(CreateTable(model.__table__, if_not_exists=True))
+        create_indexes(*models, names=indexes)(connection)
+    return upgrade
+
+def create_indexes(*models, names: Iterable[str]) -> Callable[[Any], None]:
+    """Migration step that creates the named indexes declared on the given models if they are missing."""
+    names = tuple(names)
+
+    def upgrade(connection):
+        for index in _declared_indexes(models, names):
+            index.create(connection, checkfirst=True)
+    return upgrade
+
+def get_schema_version(connection) -> int:
+    """Get the highest migration version recorded in the database."""
+    schema_version.create(connection, checkfirst=True)
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def run_migrations(engine, migrations: Iterable[Migration]) -> List[int]:
+    """Apply every migration newer than the recorded schema version, in order.
+
+    The version is read and the pending migrations applied in one transaction
+    that takes SQLite's write lock up front (BEGIN IMMEDIATE), so processes that
+    start together run them once: the others wait on the lock, then find the
+    versions recorded and skip them.
+    """
+    applied = []
+    # AUTOCOMMIT stops the driver from opening its own deferred transaction.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            current = get_schema_version(connection)
+            recorded = set(connection.execute(select(schema_version.c.version)).scalars())
+            for migration in sorted(migrations, key=lambda m: m.version):
+                if migration.version <= current or migration.version in recorded:
+                    continue
+                migration.upgrade(connection)
+                connection.execute(
+                    insert(schema_version).values(
+                        version=migration.version,
+                        description=migration.description,
+                    )
+                )
+                applied.append(migration)
+            connection.exec_driver_sql("COMMIT")
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+
+    for migration in applied:
+        logger.info("Applied migration %s: %s", migration.version, migration.description)
+    return [migration.version for migration in applied]
+
+def bootstrap_schema(app_name: str, migrations: Iterable[Migration], engine=None) -> int:
+    """Bring the app's schema up to date once per process and return its version.
+
+    Later calls return the cached version without touching the database, so it is
+    safe to call from request paths.
+    """
+    version = _schema_versions.get(app_name)
+    if version is not None:
+        return version
+
+    with _schema_lock:
+        if app_name not in _schema_versions:
+            engine = engine if engine is not None else get_engine(app_name)
+            migrations = list(migrations)
+            run_migrations(engine, migrations)
+            _schema_versions[app_name] = max((m.version for m in migrations), default=0)
+        return _schema_versions[app_name]
+
+@asynccontextmanager
+async def schema_lifespan(init_db: Callable[[], Any]):
+    """App lifespan task that brings the schema up to date before requests are served.
+
+    Running it here rather than at import keeps ``reflex export`` (and the image
+    build that runs it) from creating or migrating the database.
+    """
+    await asyncio.get_running_loop().run_in_executor(None, init_db)
+    yield
+
+def explain_query_plan(connection, statement) -> List[str]:
+    """Get the detail lines of SQLite's EXPLAIN QUERY PLAN for a statement."""
+    compiled = statement.compile(dialect=connection.dialect)
+    rows = connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled}",
+        tuple(compiled.params[name] for name in compiled.positiontup or ()),
+    )
+    return [row[-1] for row in rows]
+
+_VIRTUAL_INDEX_RE = re.compile(r" VIRTUAL TABLE INDEX \d+:\S")
+
+def find_full_scans(connection, statement) -> List[str]:
+    """Get the plan steps where SQLite scans a whole table instead of using an index.
+
+    Virtual tables (such as FTS5) count as indexed when their module was handed a
+    constraint to use, which shows up as a non-empty index string in the plan.
+    """
+    return [
+        detail for detail in explain_query_plan(connection, statement)
+        if detail.startswith("SCAN")
+        and " USING " not in detail
+        and not _VIRTUAL_INDEX_RE.search(detail)
+    ]
+
+def check_query_plans(engine, queries: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each named query that falls back to a full table scan to its offending plan steps."""
+    failures = {}
+    with engine.connect() as connection:
+        for name, statement in queries.items():
+            scans = find_full_scans(connection, statement)
+            if scans:
+                failures[name] = scans
+    return failures
+
+def projected_columns(model, exclude: Iterable[str] = ()) -> List[Any]:
+    """Columns of a model for a Core select whose rows can be returned as-is.
+
+    DateTime columns are read as their stored text, which SQLAlchemy always
+    writes with six fractional digits. SQLite turns the space separator into
+    ``T`` and drops an all-zero fraction, as isoformat() does, which yields the
+    same ISO string ``to_dict`` produces without parsing a datetime per row.
+    """
+    columns = []
+    for column in model.__table__.columns:
+        if column.key in exclude:
+            continue
+        if isinstance(column.type, DateTime):
+            text = func.replace(type_coerce(column, String), " ", "T")
+            columns.append(func.replace(text, ".000000", "").label(column.key))
+        else:
+            columns.append(column)
+    return columns
+
+def epoch_seconds(column) -> Any:
+    """A DateTime column read as float seconds since the epoch, computed by SQLite."""
+    return ((func.julianday(column) - 2440587.5) * 86400.0).label(column.key)
+
+def rows_to_dicts(result) -> List[Dict[str, Any]]:
+    """Turn a Core result into a list of plain dictionaries.
+
+    Pass a result from a Connection, e.g. a session's ``connection()``. A Session
+    runs selects through the ORM, which buffers the rows and counts them again.
+    """
+    keys = list(result.keys())
+    rows = [dict(zip(keys, row)) for row in result]
+    recorder.record_rows(len(rows))
+    return rows
+
+def fetch_dicts(connection, statement) -> List[Dict[str, Any]]:
+    """Run a column-projected select on a Connection and return its rows as dictionaries, skipping the ORM."""
+    return rows_to_dicts(connection.execute(statement))
+
 class BaseModel(Base):
     """Base model with common fields."""
     __abstract__ = True
-    
+
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,95 @@
+"""Shared, long-lived HTTP clients for calls to outside APIs."""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+import asyncio
+import importlib.util
+import logging
+import threading
+
+import httpx
+
+from .database import _resolve_settings
+
+logger = logging.getLogger(__name__)
+
+# Overridable through HTTP_* / <APP_NAME>_HTTP_* environment variables.
+HTTP_CLIENT_DEFAULTS: Dict[str, Any] = {
+    "max_connections": 20,
+    "max_keepalive": 10,
+    "keepalive_expiry": 30,  # seconds an idle connection stays open
+    "connect_timeout": 5,
+    "read_timeout": 10,
+    "write_timeout": 10,
+    "pool_timeout": 5,  # seconds to wait for a free connection
+    "http2": "true",
+}
+
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_clients_lock = threading.Lock()
+
+def get_http_client_settings(app_name: str) -> Dict[str, Any]:
+    """Get the app's HTTP client settings with environment overrides applied."""
+    settings = _resolve_settings(app_name, "HTTP_", HTTP_CLIENT_DEFAULTS)
+    for name in ("max_connections", "max_keepalive"):
+        settings[name] = int(settings[name])
+    for name in ("keepalive_expiry", "connect_timeout", "read_timeout", "write_timeout", "pool_timeout"):
+        settings[name] = float(settings[name])
+    settings["http2"] = str(settings["http2"]).lower() in ("1", "true", "yes", "on")
+    return settings
+
+def create_http_client(app_name: str) -> httpx.AsyncClient:
+    """Create a keep-alive client for the given app.
+
+    Prefer get_http_client, which hands out a single shared client per app.
+    """
+    settings = get_http_client_settings(app_name)
+    http2 = settings["http2"]
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested for %s but the h2 package is not installed; using HTTP/1.1", app_name)
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(
+            connect=settings["connect_timeout"],
+            read=settings["read_timeout"],
+            write=settings["write_timeout"],
+            pool=settings["pool_timeout"],
+        ),
+    )
+
+def get_http_client(app_name: str) -> httpx.AsyncClient:
+    """Get the process-wide client for the given app, creating it on first use.
+
+    Pooled connections belong to the event loop that opened them, so a call from a
+    different loop (a new ``asyncio.run``) gets a fresh client.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        entry = _clients.get(app_name)
+        if entry is None or entry[0] is not loop or entry[1].is_closed:
+            entry = _clients[app_name] = (loop, create_http_client(app_name))
+        return entry[1]
+
+async def close_http_clients() -> None:
+    """Close every shared client opened on the running loop, e.g. on shutdown."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        names = [name for name, (owner, _) in _clients.items() if owner is loop]
+        clients = [_clients.pop(name)[1] for name in names]
+    for client in clients:
+        await client.aclose()
+
+@asynccontextmanager
+async def http_clients_lifespan():
+    """App lifespan task that closes the shared clients when the server stops."""
+    try:
+        yield
+    finally:
+        await close_http_clients()
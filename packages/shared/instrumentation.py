@@ -0,0 +1,243 @@
+"""Query instrumentation and slow-query logging for SQLAlchemy engines."""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+import functools
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+slow_query_logger = logging.getLogger("shared.slow_queries")
+
+# Statements slower than this many milliseconds are written to the slow-query log.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+class QueryScope:
+    """Queries issued while handling one event."""
+
+    __slots__ = ("name", "queries", "total_time", "rows", "hold_time")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.hold_time = 0.0
+
+_current_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+_last_statement: ContextVar[Optional[str]] = ContextVar("last_statement", default=None)
+
+class QueryRecorder:
+    """Aggregate per-statement latency, per-scope query counts and slow queries."""
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, max_statements: int = 500, max_slow: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Dict[str, Any]] = {}
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._slow_queries: deque = deque(maxlen=max_slow)
+
+    def record_statement(self, statement: str, elapsed: float, rows: int = 0) -> None:
+        """Record one executed statement against its aggregate and the current scope."""
+        sql = _WHITESPACE_RE.sub(" ", statement).strip()
+        scope = _current_scope.get()
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    sql = "<other>"
+                    stats = self._statements.get(sql)
+                if stats is None:
+                    stats = self._statements[sql] = {"count": 0, "total_time": 0.0, "max_time": 0.0, "rows": 0}
+            stats["count"] += 1
+            stats["total_time"] += elapsed
+            stats["max_time"] = max(stats["max_time"], elapsed)
+            stats["rows"] += rows
+        _last_statement.set(sql)
+
+        if scope is not None:
+            scope.queries += 1
+            scope.total_time += elapsed
+            scope.rows += rows
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            scope_name = scope.name if scope is not None else "-"
+            with self._lock:
+                self._slow_queries.append({
+                    "statement": sql,
+                    "scope": scope_name,
+                    "elapsed_ms": elapsed_ms,
+                    "at": time.time(),
+                })
+            slow_query_logger.warning("%.1fms [%s] %s", elapsed_ms, scope_name, sql)
+
+    def record_rows(self, rows: int) -> None:
+        """Attribute returned rows to the statement most recently run in this context."""
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.rows += rows
+        sql = _last_statement.get()
+        if sql is not None:
+            with self._lock:
+                stats = self._statements.get(sql)
+                if stats is not None:
+                    stats["rows"] += rows
+
+    def record_hold(self, name: str, elapsed: float) -> None:
+        """Attribute the time a unit of work held a pooled connection to the current scope."""
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.hold_time += elapsed
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            scope_name = scope.name if scope is not None else name
+            slow_query_logger.warning("%.1fms [%s] connection held by unit of work", elapsed_ms, scope_name)
+
+    def record_scope(self, scope: QueryScope, elapsed: float) -> None:
+        """Fold a finished scope into the per-handler aggregates."""
+        with self._lock:
+            stats = self._scopes.get(scope.name)
+            if stats is None:
+                stats = self._scopes[scope.name] = {
+                    "events": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_time": 0.0,
+                    "wall_time": 0.0,
+                    "rows": 0,
+                    "hold_time": 0.0,
+                    "max_hold_time": 0.0,
+                }
+            stats["events"] += 1
+            stats["queries"] += scope.queries
+            stats["max_queries"] = max(stats["max_queries"], scope.queries)
+            stats["db_time"] += scope.total_time
+            stats["wall_time"] += elapsed
+            stats["rows"] += scope.rows
+            stats["hold_time"] += scope.hold_time
+            stats["max_hold_time"] = max(stats["max_hold_time"], scope.hold_time)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of everything recorded so far, slowest statements first."""
+        with self._lock:
+            statements = [
+                {"statement": sql, **stats, "avg_time": stats["total_time"] / stats["count"]}
+                for sql, stats in self._statements.items()
+            ]
+            scopes = {
+                name: {**stats, "avg_queries": stats["queries"] / stats["events"]}
+                for name, stats in self._scopes.items()
+            }
+            slow_queries = list(self._slow_queries)
+        statements.sort(key=lambda s: s["total_time"], reverse=True)
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "statements": statements,
+            "scopes": scopes,
+            "slow_queries": slow_queries,
+        }
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._statements.clear()
+            self._scopes.clear()
+            self._slow_queries.clear()
+
+recorder = QueryRecorder()
+_instrumented_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+def get_query_stats() -> Dict[str, Any]:
+    """Get the recorded query statistics for benchmarks and dashboards."""
+    return recorder.snapshot()
+
+def reset_query_stats() -> None:
+    """Clear the recorded query statistics."""
+    recorder.reset()
+
+def instrument_engine(engine) -> None:
+    """Time every statement the (sync) engine executes. Safe to call more than once."""
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        # SQLite only reports rowcount for DML; SELECT rows are counted as they are loaded.
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        recorder.record_statement(statement, elapsed, rows)
+
+@event.listens_for(Session, "do_orm_execute")
+def _count_orm_rows(orm_execute_state):
+    """Count rows returned by buffered ORM selects; streamed results are left alone."""
+    options = orm_execute_state.execution_options
+    if not orm_execute_state.is_select or options.get("yield_per") or options.get("stream_results"):
+        return None
+    frozen = orm_execute_state.invoke_statement().freeze()
+    recorder.record_rows(len(frozen.data))
+    return frozen()
+
+@contextmanager
+def query_scope(name: str) -> Iterator[QueryScope]:
+    """Attribute queries run inside the block to ``name``. Nested scopes join the outer one."""
+    scope = _current_scope.get()
+    if scope is not None:
+        yield scope
+        return
+
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    start = time.perf_counter()
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        recorder.record_scope(scope, time.perf_counter() - start)
+
+def track_queries(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorate an event handler so its queries are counted under its qualified name."""
+    def decorator(fn: Callable) -> Callable:
+        scope_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with query_scope(scope_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        if inspect.isasyncgenfunction(fn):
+            # Handlers that yield intermediate state stay in one scope across yields.
+            @functools.wraps(fn)
+            async def async_gen_wrapper(*args, **kwargs):
+                with query_scope(scope_name):
+                    async for update in fn(*args, **kwargs):
+                        yield update
+            return async_gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with query_scope(scope_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,178 @@
+"""Process-wide token-bucket rate limiting for calls to quota-limited APIs."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority: ContextVar[int] = ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+@contextmanager
+def request_priority(level: int) -> Iterator[None]:
+    """Run the calls made inside the block at ``level``, e.g. BACKGROUND for refreshes."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    """Priority of calls made from the current context."""
+    return _priority.get()
+
+class RateLimited(RuntimeError):
+    """Raised when a call would wait longer than allowed for quota."""
+
+    def __init__(self, retry_after: float, message: Optional[str] = None):
+        super().__init__(message or f"Rate limited; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """``capacity`` calls per ``period`` seconds, refilled continuously."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.consumed = 0
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_for(self, tokens: float) -> float:
+        """Seconds until ``tokens`` tokens are available, after a refill."""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def take(self) -> None:
+        self.tokens -= 1
+        self.consumed += 1
+
+class RateLimiter:
+    """Named token buckets that every call must draw from, granted in priority order.
+
+    A call that finds every bucket holding a token and nobody queued goes straight
+    through. Otherwise it joins a heap ordered by (priority, arrival) that a single
+    dispatcher task drains as tokens refill, so interactive calls overtake queued
+    background ones. ``penalize`` pauses everyone after the API itself says to
+    slow down.
+    """
+
+    def __init__(self, budgets: Dict[str, Tuple[int, float]]):
+        self.buckets = {name: TokenBucket(capacity, period) for name, (capacity, period) in budgets.items()}
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.rejected = 0
+        self.throttled = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def estimate_wait(self, priority: Optional[int] = None) -> float:
+        """Seconds a call made now at ``priority`` would wait for its turn."""
+        priority = _priority.get() if priority is None else priority
+        now = time.monotonic()
+        ahead = sum(1 for queued, _, waiter in self._queue if queued <= priority and not waiter.done())
+        wait = max(0.0, self._paused_until - now)
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+            wait = max(wait, bucket.wait_for(ahead + 1))
+        return wait
+
+    async def acquire(self, priority: Optional[int] = None, max_wait: Optional[float] = None) -> float:
+        """Wait for a token from every bucket and return the seconds waited.
+
+        Raises RateLimited, without queuing, if the estimated wait exceeds ``max_wait``.
+        """
+        priority = _priority.get() if priority is None else priority
+        wait = self.estimate_wait(priority)
+        if max_wait is not None and wait > max_wait:
+            self.rejected += 1
+            raise RateLimited(wait)
+        if wait == 0 and not self._queue:
+            self._take()
+            self._grant(priority, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._order), waiter))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await waiter
+        waited = time.monotonic() - start
+        self._grant(priority, waited)
+        return waited
+
+    def penalize(self, retry_after: float) -> None:
+        """Hold every call for ``retry_after`` seconds, e.g. after an HTTP 429."""
+        self.throttled += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning("API asked to back off; pausing calls for %.1fs", retry_after)
+
+    def stats(self) -> Dict[str, object]:
+        """Quota consumption and queueing counters since startup."""
+        now = time.monotonic()
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+        granted = sum(self.granted.values())
+        return {
+            "budgets": {
+                name: {
+                    "capacity": bucket.capacity,
+                    "period": bucket.period,
+                    "remaining": int(bucket.tokens),
+                    "consumed": bucket.consumed,
+                }
+                for name, bucket in self.buckets.items()
+            },
+            "granted_interactive": self.granted[INTERACTIVE],
+            "granted_background": self.granted[BACKGROUND],
+            "queued": sum(1 for _, _, waiter in self._queue if not waiter.done()),
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "wait_time_avg": self.wait_time_total / granted if granted else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def _take(self) -> None:
+        for bucket in self.buckets.values():
+            bucket.take()
+
+    def _grant(self, priority: int, waited: float) -> None:
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+    async def _dispatch(self) -> None:
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.done():
+                # Its caller was cancelled while queued.
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(1))
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._queue)
+            self._take()
+            waiter.set_result(None)
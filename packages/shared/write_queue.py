@@ -0,0 +1,182 @@
+"""Group-commit write queue for high-frequency inserts and updates."""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from .database import _resolve_settings, get_engine, get_session_maker
+from .instrumentation import query_scope
+
+logger = logging.getLogger(__name__)
+
+# Overridable through WRITE_QUEUE_* / <APP_NAME>_WRITE_QUEUE_* environment variables.
+WRITE_QUEUE_DEFAULTS: Dict[str, Any] = {
+    "flush_ms": 10,  # longest a write waits for company before its batch commits
+    "max_batch": 200,
+    "max_size": 10000,
+}
+
+_STOP = object()
+
+class WriteQueueFull(RuntimeError):
+    """Raised when a write is submitted while the queue is at capacity."""
+
+class WriteQueue:
+    """Serialize writes on one background thread and commit them in batches.
+
+    Each write intent is a callable taking a Session as its first argument. Intents
+    that arrive within ``flush_interval`` of each other share a single transaction,
+    so a burst of clicks costs one fsync instead of one per click. If a batch fails,
+    its intents are retried one transaction each so that a bad write only fails its
+    own future.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        flush_interval: float = 0.01,
+        max_batch: int = 200,
+        max_size: int = 10000,
+        name: str = "write-queue",
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.largest_batch = 0
+
+    def submit(self, intent: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue ``intent(session, *args, **kwargs)`` and return a future for its committed result."""
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((future, intent, args, kwargs))
+        except queue.Full:
+            raise WriteQueueFull(f"{self.name} is full ({self._queue.maxsize} pending writes)")
+        return future
+
+    async def submit_async(self, intent: Callable[..., Any], *args, **kwargs) -> Any:
+        """Queue a write and wait until it has been committed."""
+        return await asyncio.wrap_future(self.submit(intent, *args, **kwargs))
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending writes and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing how well writes are being coalesced."""
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "writes": self.writes,
+            "failed": self.failed,
+            "largest_batch": self.largest_batch,
+            "avg_batch": self.writes / self.batches if self.batches else 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            with query_scope(self.name):
+                self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: List[Tuple[Future, Callable[..., Any], tuple, dict]]) -> None:
+        batch = [entry for entry in batch if entry[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            with self.session_factory() as session:
+                results = [intent(session, *args, **kwargs) for _, intent, args, kwargs in batch]
+                session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0][0], e)
+            else:
+                logger.warning("%s: batch of %s failed, retrying writes individually", self.name, len(batch))
+                for entry in batch:
+                    self._commit_one(entry)
+            return
+
+        self._record(len(batch))
+        for (future, _, _, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_one(self, entry: Tuple[Future, Callable[..., Any], tuple, dict]) -> None:
+        future, intent, args, kwargs = entry
+        try:
+            with self.session_factory() as session:
+                result = intent(session, *args, **kwargs)
+                session.commit()
+        except Exception as e:
+            self._fail(future, e)
+            return
+        self._record(1)
+        future.set_result(result)
+
+    def _fail(self, future: Future, error: Exception) -> None:
+        self.failed += 1
+        future.set_exception(error)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.writes += size
+        self.largest_batch = max(self.largest_batch, size)
+
+_write_queues: Dict[str, WriteQueue] = {}
+_write_queues_lock = threading.Lock()
+
+def get_write_queue(app_name: str) -> WriteQueue:
+    """Get the process-wide write queue for the given app's database."""
+    with _write_queues_lock:
+        write_queue = _write_queues.get(app_name)
+        if write_queue is None:
+            settings = _resolve_settings(app_name, "WRITE_QUEUE_", WRITE_QUEUE_DEFAULTS)
+            write_queue = _write_queues[app_name] = WriteQueue(
+                get_session_maker(get_engine(app_name)),
+                flush_interval=int(settings["flush_ms"]) / 1000,
+                max_batch=int(settings["max_batch"]),
+                max_size=int(settings["max_size"]),
+                name=f"{app_name}-writer",
+            )
+            atexit.register(write_queue.close)
+        return write_queue
@@ -0,0 +1,13 @@
+"""Shared test setup: import paths and a scratch directory for the apps' databases."""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+def pytest_configure(config):
+    """Run from a scratch directory so the apps create their databases under it, not the repo."""
+    os.chdir(tempfile.mkdtemp(prefix="python-web-tests-"))
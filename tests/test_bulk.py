@@ -0,0 +1,36 @@
+"""Tests for parsing bulk todo imports."""
+
+import io
+from datetime import datetime
+
+import pytest
+
+from todo_app.bulk import read_todos
+
+def parse(text, fmt):
+    return list(read_todos(io.StringIO(text), fmt))
+
+def test_aware_timestamps_are_stored_as_naive_utc():
+    rows = parse(
+        '{"title": "East", "created_at": "2024-03-01T09:30:00+02:00"}\n'
+        '{"title": "Naive", "created_at": "2024-03-01T09:30:00"}\n',
+        "jsonl",
+    )
+    assert rows[0]["created_at"] == datetime(2024, 3, 1, 7, 30)
+    assert rows[1]["created_at"] == datetime(2024, 3, 1, 9, 30)
+
+def test_csv_timestamps_are_normalized_too():
+    rows = parse("title,created_at\nWest,2024-03-01T09:30:00-05:00\n", "csv")
+    assert rows[0]["created_at"] == datetime(2024, 3, 1, 14, 30)
+
+@pytest.mark.parametrize("line, message", [
+    ("{not json", "Line 2: invalid JSON"),
+    ('["a", "list"]', "Line 2: expected a JSON object"),
+    ('"text"', "Line 2: expected a JSON object"),
+])
+def test_bad_jsonl_lines_report_their_line_number(line, message):
+    with pytest.raises(ValueError, match=message):
+        parse('{"title": "Fine"}\n' + line + "\n", "jsonl")
+
+def test_blank_jsonl_lines_are_skipped():
+    assert [row["title"] for row in parse('{"title": "A"}\n\n{"title": "B"}\n', "jsonl")] == ["A", "B"]
@@ -0,0 +1,66 @@
+"""Tests for versioned schema migrations."""
+
+import threading
+
+from sqlalchemy import create_engine
+
+from shared.database import Migration, get_schema_version, run_migrations
+
+def create_notes(connection):
+    connection.exec_driver_sql("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+
+def index_notes(connection):
+    connection.exec_driver_sql("CREATE INDEX ix_notes_body ON notes (body)")
+
+MIGRATIONS = [
+    Migration(1, "Create notes", create_notes),
+    Migration(2, "Index notes", index_notes),
+]
+
+def test_applies_pending_migrations_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/app.db")
+    assert run_migrations(engine, MIGRATIONS[:1]) == [1]
+    assert run_migrations(engine, MIGRATIONS) == [2]
+    assert run_migrations(engine, MIGRATIONS) == []
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == 2
+
+def test_failed_migration_rolls_back(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/app.db")
+
+    def broken(connection):
+        connection.exec_driver_sql("CREATE TABLE half (id INTEGER)")
+        raise RuntimeError("boom")
+
+    try:
+        run_migrations(engine, MIGRATIONS + [Migration(3, "Broken", broken)])
+    except RuntimeError:
+        pass
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == 0
+        tables = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master")}
+    assert "notes" not in tables and "half" not in tables
+
+def test_concurrent_starts_apply_each_migration_once(tmp_path):
+    url = f"sqlite:///{tmp_path}/app.db"
+    applied, errors = [], []
+    start = threading.Barrier(6)
+
+    def boot():
+        engine = create_engine(url)
+        start.wait()
+        try:
+            applied.extend(run_migrations(engine, MIGRATIONS))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            engine.dispose()
+
+    threads = [threading.Thread(target=boot) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(applied) == [1, 2]
@@ -0,0 +1,26 @@
+"""Tests for column-projected selects returning rows as dictionaries."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, String, create_engine, select
+
+from shared.database import BaseModel, fetch_dicts, projected_columns
+
+class Note(BaseModel):
+    __tablename__ = "projection_notes"
+    body = Column(String(50))
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 3, 1, 9, 30),
+    datetime(2024, 3, 1, 9, 30, 15, 120000),
+    datetime(2024, 3, 1, 9, 30, 15, 7),
+])
+def test_datetimes_match_isoformat(tmp_path, created_at):
+    engine = create_engine(f"sqlite:///{tmp_path}/notes.db")
+    Note.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(Note.__table__.insert().values(body="x", created_at=created_at, updated_at=created_at))
+        row = fetch_dicts(connection, select(*projected_columns(Note)))[0]
+    assert row["created_at"] == created_at.isoformat()
+    assert row["updated_at"] == created_at.isoformat()
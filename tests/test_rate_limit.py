@@ -0,0 +1,92 @@
+"""Tests for the prioritized token-bucket rate limiter."""
+
+import asyncio
+
+import pytest
+
+from shared.rate_limit import BACKGROUND, INTERACTIVE, RateLimited, RateLimiter, request_priority
+
+async def drain(limiter, calls):
+    for _ in range(calls):
+        await limiter.acquire()
+
+def test_interactive_calls_overtake_queued_background_ones():
+    async def scenario():
+        limiter = RateLimiter({"second": (1, 0.05)})
+        await drain(limiter, 1)
+        order = []
+
+        async def call(tag, priority):
+            await limiter.acquire(priority)
+            order.append(tag)
+
+        background = [asyncio.ensure_future(call(f"background {i}", BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        await call("interactive", INTERACTIVE)
+        await asyncio.gather(*background)
+        return order, limiter.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["interactive", "background 0", "background 1", "background 2"]
+    assert stats["granted_interactive"] == 2
+    assert stats["granted_background"] == 3
+
+def test_priority_comes_from_the_calling_context():
+    async def scenario():
+        limiter = RateLimiter({"second": (5, 1.0)})
+        with request_priority(BACKGROUND):
+            await limiter.acquire()
+        await limiter.acquire()
+        return limiter.granted
+
+    assert asyncio.run(scenario()) == {INTERACTIVE: 1, BACKGROUND: 1}
+
+def test_exhausted_daily_budget_is_rejected_without_queuing():
+    async def scenario():
+        limiter = RateLimiter({"minute": (60, 60.0), "day": (3, 86400.0)})
+        await drain(limiter, 3)
+        with pytest.raises(RateLimited) as raised:
+            await limiter.acquire(max_wait=60)
+        return limiter, raised.value
+
+    limiter, error = asyncio.run(scenario())
+    # One token refills every 86400 / 3 seconds.
+    assert error.retry_after == pytest.approx(28800, abs=1)
+    stats = limiter.stats()
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 0
+    assert stats["budgets"]["day"]["consumed"] == 3
+
+def test_cancelled_waiter_does_not_consume_a_token():
+    async def scenario():
+        limiter = RateLimiter({"second": (1, 0.1)})
+        await drain(limiter, 1)
+        abandoned = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        await limiter.acquire()
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["budgets"]["second"]["consumed"] == 2
+    assert stats["granted_interactive"] == 2
+    assert stats["queued"] == 0
+
+def test_wait_estimate_counts_only_calls_served_first():
+    async def scenario():
+        limiter = RateLimiter({"second": (2, 1.0)})
+        assert limiter.estimate_wait() == 0
+        await drain(limiter, 2)
+        queued = asyncio.ensure_future(limiter.acquire(BACKGROUND))
+        await asyncio.sleep(0)
+        # Tokens refill every half second; the queued background call is ahead of background only.
+        estimates = limiter.estimate_wait(INTERACTIVE), limiter.estimate_wait(BACKGROUND)
+        limiter.penalize(3)
+        paused = limiter.estimate_wait(INTERACTIVE)
+        queued.cancel()
+        return estimates, paused
+
+    (interactive, background), paused = asyncio.run(scenario())
+    assert interactive == pytest.approx(0.5, abs=0.05)
+    assert background == pytest.approx(1.0, abs=0.05)
+    assert paused == pytest.approx(3, abs=0.05)
@@ -0,0 +1,142 @@
+"""Tests for the process-wide todo cache and its write-through updates."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select
+
+from todo_app.cache import TodoCache, _load_all_todos
+from todo_app.database import engine, init_db
+from todo_app.models import Todo
+
+@pytest.fixture
+def cache():
+    init_db()
+    with engine.begin() as connection:
+        connection.execute(delete(Todo))
+    return loaded(TodoCache(_load_all_todos))
+
+def loaded(cache):
+    """Read the table into the cache; writes only reach a cache that has been read."""
+    cache.counts()
+    return cache
+
+def add(cache, title, priority="medium"):
+    return asyncio.run(cache.add(title=title, description="", priority=priority))
+
+def stored_priorities():
+    with engine.connect() as connection:
+        return dict(connection.execute(select(Todo.id, Todo.priority)).all())
+
+def test_add_is_visible_once_committed(cache):
+    row = add(cache, "Write tests")
+    rows, has_more, version = cache.page()
+    assert [r.id for r in rows] == [row.id]
+    assert not has_more
+    assert version == cache.version == 1
+    assert cache.counts() == {"total": 1, "completed": 0, "pending": 1}
+
+@pytest.mark.parametrize("title, priority, message", [
+    ("  ", "medium", "Title is required"),
+    ("Fine", "urgent", "Invalid priority: urgent"),
+])
+def test_add_rejects_invalid_todos(cache, title, priority, message):
+    with pytest.raises(ValueError, match=message):
+        add(cache, title, priority)
+    assert cache.counts()["total"] == 0
+    assert stored_priorities() == {}
+
+def test_add_strips_the_title(cache):
+    assert add(cache, "  Padded  ").title == "Padded"
+
+def test_toggle_and_delete_write_through(cache):
+    row = add(cache, "Toggle me")
+    assert asyncio.run(cache.toggle(row.id, True)) is True
+    assert cache.get(row.id).completed
+    assert cache.counts()["completed"] == 1
+    # Repeating a toggle keeps the status it was toggled to.
+    assert asyncio.run(cache.toggle(row.id, True)) is True
+    assert cache.counts()["completed"] == 1
+    assert asyncio.run(cache.toggle(row.id, False)) is False
+    assert cache.counts()["completed"] == 0
+
+    assert asyncio.run(cache.delete(row.id)) is True
+    assert cache.get(row.id) is None
+    assert asyncio.run(cache.toggle(row.id, True)) is None
+    assert asyncio.run(cache.delete(row.id)) is False
+
+def test_changes_since_replays_the_log(cache):
+    first = add(cache, "First")
+    start = cache.version
+    second = add(cache, "Second")
+    asyncio.run(cache.delete(first.id))
+
+    changes = cache.changes_since(start)
+    assert [(c.todo_id, c.row is None) for c in changes] == [(second.id, False), (first.id, True)]
+    assert cache.changes_since(cache.version) == []
+
+def test_changes_since_reports_a_truncated_log(cache):
+    cache = loaded(TodoCache(_load_all_todos, change_log_size=2))
+    for i in range(4):
+        add(cache, f"Task {i}")
+    assert cache.changes_since(0) is None
+    assert len(cache.changes_since(2)) == 2
+
+def test_pages_follow_a_keyset_cursor(cache):
+    for i in range(5):
+        add(cache, f"Task {i}")
+    first, has_more, _ = cache.page(limit=3)
+    assert has_more
+    rest, has_more, _ = cache.page(before=(first[-1].created_at, first[-1].id), limit=3)
+    assert not has_more
+    assert len({r.id for r in first + rest}) == 5
+
+def test_bulk_updates_apply_to_every_row(cache):
+    rows = [add(cache, f"Task {i}", "low") for i in range(3)]
+    updated = asyncio.run(cache.set_priority([r.id for r in rows[:2]], "high"))
+    assert sorted(updated) == sorted(r.id for r in rows[:2])
+    assert [r.id for r in cache.page(priority="high")[0]] == [rows[1].id, rows[0].id]
+
+    completed = asyncio.run(cache.complete_matching("high"))
+    assert sorted(completed) == sorted(updated)
+    deleted = asyncio.run(cache.delete_completed())
+    assert sorted(deleted) == sorted(updated)
+    assert cache.counts() == {"total": 1, "completed": 0, "pending": 1}
+
+def test_writes_before_first_read_are_loaded_later(cache):
+    unread = TodoCache(_load_all_todos)
+    add(unread, "Before first read")
+    assert unread.version == 0
+    assert unread.counts()["total"] == 1
+
+def test_unknown_priority_keeps_cache_consistent(cache):
+    rows = [add(cache, "One"), add(cache, "Two")]
+    asyncio.run(cache.set_priority([r.id for r in rows], "urgent"))
+    assert cache.counts()["total"] == 2
+    assert {r.id: r.priority for r in cache.page()[0]} == stored_priorities()
+
+    # A fresh process loads the same rows from the database.
+    restarted = TodoCache(_load_all_todos)
+    assert len(restarted.page()[0]) == 2
+    assert len(restarted.page(priority="urgent")[0]) == 2
+
+def test_invalidate_reloads_rows_written_elsewhere(cache):
+    add(cache, "Cached")
+    with engine.begin() as connection:
+        connection.execute(delete(Todo))
+    assert cache.counts()["total"] == 1
+    cache.invalidate()
+    assert cache.counts()["total"] == 0
+    assert cache.changes_since(0) is None
+
+def test_writes_wake_feed_subscribers(cache):
+    async def scenario():
+        subscription = cache.feed.subscribe()
+        try:
+            await cache.add(title="Ping", description="", priority="medium")
+            return await subscription.wait(1.0)
+        finally:
+            cache.feed.unsubscribe(subscription)
+
+    assert asyncio.run(scenario())
+    assert cache.feed.published == 1
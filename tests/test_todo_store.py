@@ -0,0 +1,77 @@
+"""Tests for the indexed in-memory todo store."""
+
+from todo_app.records import TodoRecord
+from todo_app.store import TodoStore, sort_key
+
+def make_row(todo_id, completed=False, priority="medium", created_at=None):
+    created_at = float(todo_id) if created_at is None else created_at
+    return TodoRecord(todo_id, f"Task {todo_id}", None, completed, priority, created_at, created_at)
+
+def ids(rows):
+    return [row.id for row in rows]
+
+def test_select_is_newest_first_across_buckets():
+    store = TodoStore([
+        make_row(1, priority="low"),
+        make_row(2, completed=True, priority="high"),
+        make_row(3, priority="high"),
+        make_row(4, completed=True, priority="low"),
+    ])
+    assert ids(store.select()) == [4, 3, 2, 1]
+    assert ids(store.select("pending")) == [3, 1]
+    assert ids(store.select("completed", "low")) == [4]
+    assert ids(store.select(priority="high")) == [3, 2]
+
+def test_select_pages_with_keyset_cursor():
+    store = TodoStore([make_row(i) for i in range(1, 8)])
+    first = store.select(limit=3)
+    assert ids(first) == [7, 6, 5]
+    assert ids(store.select(before=sort_key(first[-1]), limit=3)) == [4, 3, 2]
+    assert store.oldest_key() == sort_key(make_row(1))
+
+def test_ties_on_created_at_order_by_id():
+    store = TodoStore([make_row(i, created_at=100.0) for i in (3, 1, 2)])
+    assert ids(store.select()) == [3, 2, 1]
+
+def test_counts_follow_updates_and_discards():
+    store = TodoStore([make_row(1), make_row(2), make_row(3, completed=True)])
+    assert store.counts() == {"total": 3, "completed": 1, "pending": 2}
+
+    store.update(1, completed=True, priority="high")
+    assert store.counts() == {"total": 3, "completed": 2, "pending": 1}
+    assert ids(store.select("completed", "high")) == [1]
+    assert ids(store.select("pending", "medium")) == [2]
+
+    assert store.discard(2).id == 2
+    assert store.discard(2) is None
+    assert store.counts() == {"total": 2, "completed": 2, "pending": 0}
+    assert 2 not in store
+
+def test_put_replaces_row_with_same_id():
+    store = TodoStore([make_row(1)])
+    store.put(make_row(1, completed=True))
+    assert len(store) == 1
+    assert store.count("pending") == 0
+    assert store.get(1).completed
+
+def test_update_of_missing_row_is_ignored():
+    store = TodoStore()
+    assert store.update(1, completed=True) is None
+    assert len(store) == 0
+
+def test_unknown_priority_is_held_like_any_other():
+    store = TodoStore([make_row(1), make_row(2, priority="urgent")])
+    assert ids(store.select()) == [2, 1]
+    assert ids(store.select(priority="urgent")) == [2]
+    assert store.count("pending") == 2
+
+    store.update(1, priority="urgent")
+    assert ids(store.select(priority="urgent")) == [2, 1]
+    assert store.select(priority="medium") == []
+
+def test_clear_empties_every_bucket():
+    store = TodoStore([make_row(1), make_row(2, completed=True, priority="low")])
+    store.clear()
+    assert len(store) == 0
+    assert store.select() == []
+    assert store.oldest_key() is None
@@ -0,0 +1,103 @@
+"""Tests for the group-commit write queue."""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from shared.database import get_session_maker
+from shared.write_queue import WriteQueue, WriteQueueFull
+
+metadata = MetaData()
+notes = Table("notes", metadata, Column("id", Integer, primary_key=True), Column("body", String))
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/queue.db")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def make_queue(engine, **kwargs):
+    return WriteQueue(get_session_maker(engine), **kwargs)
+
+def add_note(session, body):
+    return session.execute(insert(notes).values(body=body)).inserted_primary_key[0]
+
+def fail(session):
+    raise ValueError("bad write")
+
+def stored(engine):
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(notes.c.body)).scalars())
+
+def test_writes_within_the_flush_interval_share_a_batch(engine):
+    write_queue = make_queue(engine, flush_interval=0.2)
+    futures = [write_queue.submit(add_note, f"note {i}") for i in range(5)]
+    assert sorted(f.result(timeout=5) for f in futures) == [1, 2, 3, 4, 5]
+    write_queue.close()
+
+    assert write_queue.stats()["batches"] == 1
+    assert write_queue.stats()["largest_batch"] == 5
+    assert len(stored(engine)) == 5
+
+def test_batches_are_capped_at_max_batch(engine):
+    write_queue = make_queue(engine, flush_interval=0.2, max_batch=2)
+    futures = [write_queue.submit(add_note, f"note {i}") for i in range(5)]
+    for future in futures:
+        future.result(timeout=5)
+    write_queue.close()
+
+    assert write_queue.stats()["batches"] == 3
+    assert write_queue.stats()["largest_batch"] == 2
+
+def test_submit_raises_when_the_queue_is_full(engine):
+    write_queue = make_queue(engine, max_batch=1, max_size=2)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(session):
+        started.set()
+        release.wait(5)
+        return add_note(session, "blocking")
+
+    first = write_queue.submit(blocking)
+    assert started.wait(5)
+    queued = [write_queue.submit(add_note, "a"), write_queue.submit(add_note, "b")]
+    with pytest.raises(WriteQueueFull):
+        write_queue.submit(add_note, "c")
+
+    release.set()
+    first.result(timeout=5)
+    for future in queued:
+        future.result(timeout=5)
+    write_queue.close()
+    assert stored(engine) == ["a", "b", "blocking"]
+
+def test_a_failed_batch_retries_each_write_on_its_own(engine):
+    write_queue = make_queue(engine, flush_interval=0.2)
+    good = write_queue.submit(add_note, "kept")
+    bad = write_queue.submit(fail)
+    also_good = write_queue.submit(add_note, "also kept")
+
+    assert good.result(timeout=5)
+    assert also_good.result(timeout=5)
+    with pytest.raises(ValueError, match="bad write"):
+        bad.result(timeout=5)
+    write_queue.close()
+
+    assert stored(engine) == ["also kept", "kept"]
+    stats = write_queue.stats()
+    assert stats["failed"] == 1
+    assert stats["writes"] == 2
+
+def test_close_flushes_pending_writes_without_waiting_out_the_interval(engine):
+    write_queue = make_queue(engine, flush_interval=10)
+    futures = [write_queue.submit(add_note, f"note {i}") for i in range(3)]
+
+    start = time.monotonic()
+    write_queue.close()
+    assert time.monotonic() - start < 5
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == [1, 2, 3]
+    assert len(stored(engine)) == 3
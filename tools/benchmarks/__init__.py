@@ -0,0 +1 @@
+"""Benchmarks for the Python Web monorepo, run with `python tools/dev.py bench <name>`."""
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Pushes per session when a burst of todo edits goes through the change feed.
+
+Each simulated session runs the same loop as ``TodoState.watch_changes``: wait for
+the feed, give the burst ``PUSH_INTERVAL`` to land, then read the version log.
+One editor fires ``EDITS`` toggles at once through the shared cache.
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+SESSIONS = 50
+EDITS = 1_000
+TODOS = 200
+
+async def session(todo_cache, feed, done: asyncio.Event, pushes: list, caught_up: list) -> None:
+    from todo_app.feed import PUSH_INTERVAL
+
+    subscription = feed.subscribe()
+    version = todo_cache.version
+    count = 0
+    try:
+        while not done.is_set() or version < todo_cache.version:
+            if not await subscription.wait(1.0):
+                continue
+            await asyncio.sleep(PUSH_INTERVAL)
+            changes = todo_cache.changes_since(version)
+            if changes:
+                version = changes[-1].version
+                count += 1
+    finally:
+        feed.unsubscribe(subscription)
+    pushes.append(count)
+    caught_up.append(time.perf_counter())
+
+async def run(todo_cache) -> None:
+    todo_ids = [row.id for row in todo_cache.page(limit=TODOS)[0]]
+    done = asyncio.Event()
+    pushes: list = []
+    caught_up: list = []
+    sessions = [
+        asyncio.ensure_future(session(todo_cache, todo_cache.feed, done, pushes, caught_up))
+        for _ in range(SESSIONS)
+    ]
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        todo_cache.toggle(todo_ids[i % len(todo_ids)], completed=(i // len(todo_ids)) % 2 == 0)
+        for i in range(EDITS)
+    ))
+    committed = time.perf_counter()
+    done.set()
+    await asyncio.gather(*sessions)
+
+    print(f"{SESSIONS} sessions, {EDITS} toggles committed in {(committed - start) * 1000:.0f}ms")
+    print(f"  published        {todo_cache.feed.published:>8}")
+    print(f"  wakeups          {todo_cache.feed.wakeups:>8} ({todo_cache.feed.wakeups / SESSIONS:.1f} per session)")
+    print(f"  pushes/session   {min(pushes):>8} min {max(pushes):>4} max")
+    print(f"  uncoalesced      {EDITS:>8} pushes per session, one per edit")
+    print(f"  last caught up   {(max(caught_up) - committed) * 1000:>6.0f}ms after the last commit")
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from todo_app import bulk
+        from todo_app.cache import todo_cache
+        from todo_app.database import engine, init_db, write_queue
+        init_db()
+
+        lines = "".join(f"Task {i},Description {i},false,medium\n" for i in range(TODOS))
+        bulk.import_todos(engine, io.StringIO("title,description,completed,priority\n" + lines))
+        todo_cache.invalidate()
+        asyncio.run(run(todo_cache))
+        write_queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare ORM hydration + to_dict() with the column-projected list path."""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(__file__), "../..")
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from shared.database import fetch_dicts, run_migrations
+from todo_app.migrations import MIGRATIONS
+from todo_app.models import Todo
+from todo_app.queries import list_todos
+
+SIZES = (10_000, 100_000)
+REPEAT = 5
+
+def seed(engine, count: int) -> None:
+    """Fill the todos table with ``count`` rows."""
+    start = datetime.utcnow()
+    rows = [
+        {
+            "title": f"Task {i}",
+            "description": f"Description for task {i}",
+            "completed": i % 3 == 0,
+            "priority": ("low", "medium", "high")[i % 3],
+            "created_at": start - timedelta(seconds=i),
+            "updated_at": start,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Todo.__table__), rows)
+
+def orm_path(engine):
+    with Session(engine) as session:
+        todos = session.execute(select(Todo).order_by(Todo.created_at.desc())).scalars()
+        return [todo.to_dict() for todo in todos]
+
+def projected_path(engine):
+    with engine.connect() as connection:
+        return fetch_dicts(connection, list_todos())
+
+def best_of(fn, engine) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> None:
+    print(f"{'rows':>8} {'orm + to_dict':>14} {'projected':>10} {'speedup':>8}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            run_migrations(engine, MIGRATIONS)
+            seed(engine, size)
+            assert orm_path(engine)[0] == projected_path(engine)[0]
+
+            orm = best_of(orm_path, engine)
+            projected = best_of(projected_path, engine)
+            print(f"{size:>8} {orm * 1000:>12.1f}ms {projected * 1000:>8.1f}ms {orm / projected:>7.1f}x")
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Memory and payload size of todo rows as dicts versus compact records.
+
+Memory is what the shared cache holds (every row) and what a session mirrors to
+the browser (one entity per loaded todo), measured with tracemalloc. Payload is
+the JSON the list sends on a full load: ``to_dict`` rows against entity arrays
+plus the completed map.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(__file__), "../..")
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from shared.database import fetch_dicts, run_migrations
+from todo_app.migrations import MIGRATIONS
+from todo_app.models import Todo
+from todo_app.queries import list_todo_records, list_todos
+from todo_app.records import TodoRecord
+
+SIZES = (1_000, 10_000)
+
+def seed(engine, count: int) -> None:
+    start = datetime.utcnow()
+    rows = [
+        {
+            "title": f"Task {i}",
+            "description": f"Description for task {i}",
+            "completed": i % 3 == 0,
+            "priority": ("low", "medium", "high")[i % 3],
+            "created_at": start - timedelta(seconds=i),
+            "updated_at": start,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Todo.__table__), rows)
+
+def allocated(build):
+    """The result of ``build()`` and the bytes still allocated for it."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def load_dicts(engine):
+    with engine.connect() as connection:
+        return fetch_dicts(connection, list_todos())
+
+def load_records(engine):
+    with engine.connect() as connection:
+        return list(map(TodoRecord._make, connection.execute(list_todo_records())))
+
+def main() -> None:
+    print(f"{'rows':>8} {'':>14} {'dicts':>10} {'records':>10} {'smaller':>8}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            run_migrations(engine, MIGRATIONS)
+            seed(engine, size)
+
+            dicts, dict_bytes = allocated(lambda: load_dicts(engine))
+            records, record_bytes = allocated(lambda: load_records(engine))
+            _, dict_entities = allocated(lambda: {
+                row["id"]: {field: row[field] for field in ("title", "description", "priority")}
+                for row in dicts
+            })
+            _, record_entities = allocated(lambda: {row.id: row.entity() for row in records})
+
+            with Session(engine) as session:
+                dict_payload = len(json.dumps([todo.to_dict() for todo in session.query(Todo)]))
+            record_payload = len(json.dumps({row.id: row.entity() for row in records})) + len(
+                json.dumps({row.id: True for row in records if row.completed})
+            )
+            engine.dispose()
+
+        for label, before, after in (
+            ("cache memory", dict_bytes, record_bytes),
+            ("session mirror", dict_entities, record_entities),
+            ("json payload", dict_payload, record_payload),
+        ):
+            print(f"{size:>8} {label:>14} {before / 1024:>8,.0f}KB {after / 1024:>8,.0f}KB {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Time ranked FTS5 todo searches against a LIKE scan of the same table."""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(__file__), "../..")
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+from sqlalchemy import create_engine, insert, or_, select
+from shared.database import fetch_dicts, run_migrations
+from todo_app.migrations import MIGRATIONS
+from todo_app.models import Todo
+from todo_app.search import match_query, search_results, search_todos
+
+SIZE = 100_000
+REPEAT = 20
+VOCABULARY = 20_000
+SYLLABLES = ("ka", "lo", "mi", "ren", "tu", "sa", "vo", "dex", "pi", "nor", "el", "bra", "qu", "zin", "fa", "to")
+
+def vocabulary(rng: random.Random, size: int):
+    """Distinct made-up words; drawn with Zipf weights they behave like real text."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+def seed(engine, count: int, words, weights) -> None:
+    """Fill the todos table with ``count`` rows of Zipf-distributed words."""
+    rng = random.Random(42)
+    start = datetime.utcnow()
+    rows = [
+        {
+            "title": " ".join(rng.choices(words, weights, k=4)),
+            "description": " ".join(rng.choices(words, weights, k=20)),
+            "completed": i % 3 == 0,
+            "priority": ("low", "medium", "high")[i % 3],
+            "created_at": start - timedelta(seconds=i),
+            "updated_at": start,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Todo.__table__), rows)
+
+def fts_path(engine, text: str):
+    with engine.connect() as connection:
+        return search_results(fetch_dicts(connection, search_todos(match_query(text))))
+
+def like_path(engine, text: str):
+    pattern = f"%{text}%"
+    with engine.connect() as connection:
+        return fetch_dicts(
+            connection,
+            select(Todo.id, Todo.title)
+            .where(or_(Todo.title.like(pattern), Todo.description.like(pattern)))
+            .limit(50),
+        )
+
+def median_ms(fn, engine, text: str) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(engine, text)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        run_migrations(engine, MIGRATIONS)
+        words = vocabulary(random.Random(7), VOCABULARY)
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        seed(engine, SIZE, words, weights)
+        # A common word, two mid-frequency words, a rare word and a two-word phrase.
+        queries = (words[3], words[200], words[2000], words[15000], f"{words[50]} {words[60]}")
+
+        print(f"{SIZE} todos, median of {REPEAT} runs")
+        print(f"{'query':>24} {'fts5 + bm25':>12} {'like scan':>10} {'matches':>8}")
+        for text in queries:
+            fts = median_ms(fts_path, engine, text)
+            like = median_ms(like_path, engine, text)
+            matches = len(fts_path(engine, text))
+            print(f"{text:>24} {fts:>10.2f}ms {like:>8.2f}ms {matches:>8}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Bytes of state sent to the browser when one todo is toggled.
+
+Reflex sends every var that changed during an event, plus every plain ``@rx.var``
+computed var, serialized as JSON. This drives TodoState's real handlers against
+a scratch database, with every todo loaded into the session. It then compares
+what a toggle sends now with what the list form sent: the whole ``filtered_todos``
+list and ``todos_count``, recomputed on every event.
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/todo-app"))
+
+SIZES = (1_000, 10_000)
+PUBLIC_VARS = ("todo_ids", "todo_entities", "completed_todos", "todos_count", "success_message", "error_message")
+
+def new_session(TodoState, TodoStore):
+    """A TodoState stand-in that runs the real handler code without a Reflex app."""
+    session = types.SimpleNamespace(
+        _store=TodoStore(),
+        _version=0,
+        has_more_todos=False,
+        todo_ids=[],
+        todo_entities={},
+        completed_todos={},
+        todos_count={},
+        filter_status="all",
+        filter_priority="all",
+        error_message="",
+        success_message="",
+    )
+    for name in ("_load_page", "_sync", "_within_loaded", "_put", "_discard", "_refresh_view", "_adjust_counts", "_revert"):
+        setattr(session, name, types.MethodType(getattr(TodoState, name), session))
+    TodoState.load_todos.fn(session)
+    while session.has_more_todos:
+        TodoState.load_more_todos.fn(session)
+    return session
+
+def snapshot(session):
+    return {name: json.dumps(getattr(session, name), sort_keys=True) for name in PUBLIC_VARS}
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from todo_app import bulk
+        from todo_app.cache import todo_cache
+        from todo_app.database import engine, init_db
+        from todo_app.state import TodoState
+        from todo_app.store import TodoStore
+        init_db()
+
+        print(f"{'todos':>8} {'list form':>12} {'normalized':>12} {'smaller':>8}")
+        loaded = 0
+        for size in SIZES:
+            lines = "".join(
+                f"Task {i},Description for task {i},{i % 3 == 0},{('low', 'medium', 'high')[i % 3]}\n"
+                for i in range(loaded, size)
+            )
+            bulk.import_todos(engine, io.StringIO("title,description,completed,priority\n" + lines))
+            loaded = size
+            todo_cache.invalidate()
+
+            session = new_session(TodoState, TodoStore)
+            todo_id = session.todo_ids[len(session.todo_ids) // 2]
+            before = snapshot(session)
+            TodoState.toggle_todo.fn(session, todo_id)
+            after = snapshot(session)
+
+            normalized = sum(len(name) + len(value) for name, value in after.items() if before[name] != value)
+            rows = [row._asdict() for row in session._store.select()]
+            list_form = (
+                len(json.dumps(rows)) + len(json.dumps(session.todos_count)) + len(after["success_message"])
+            )
+            print(f"{size:>8} {list_form:>10,}B {normalized:>10,}B {list_form / normalized:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Time weather API calls over a client per call against the shared keep-alive client.
+
+A local HTTP/1.1 server stands in for OpenWeatherMap and answers after 50ms. It
+has no DNS or TLS, so a new client per call costs less here than against the
+real API.
+
+A second run fires a spike of identical searches with the response cache off, to
+count the upstream calls that single-flight saves.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(__file__), "../..")
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, os.path.join(ROOT, "apps/weather-app"))
+
+import httpx
+from shared.http_client import close_http_clients
+from weather_app.weather_service import WeatherService
+
+REQUESTS = 300
+CONCURRENCY = 20
+
+PAYLOAD = json.dumps({
+    "name": "Oslo",
+    "sys": {"country": "NO"},
+    "main": {"temp": 11.2, "feels_like": 10.1, "humidity": 71, "pressure": 1012},
+    "wind": {"speed": 3.1, "deg": 200},
+    "weather": [{"main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+    "timezone": 7200,
+    "coord": {"lat": 59.91, "lon": 10.75},
+}).encode()
+
+class MockWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs add 40ms.
+    disable_nagle_algorithm = True
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with MockWeatherHandler.lock:
+            MockWeatherHandler.requests += 1
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+class PerCallService(WeatherService):
+    """The previous behaviour: a new client, and new connections, for every call."""
+
+    async def _fetch(self, path, params):
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{self.base_url}/{path}", params={**params, "appid": self.api_key})
+            response.raise_for_status()
+            return response.json()
+
+class NoSingleFlightService(WeatherService):
+    """Every caller makes its own upstream call."""
+
+    def __init__(self):
+        super().__init__()
+        self.flights.do = lambda key, fetch: fetch()
+
+async def spike(service: WeatherService) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(service.get_current_weather("Oslo") for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    await close_http_clients()
+    return elapsed
+
+async def timed(service: WeatherService, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await service.get_current_weather(f"city-{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    await close_http_clients()
+    return elapsed
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockWeatherHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/data/2.5"
+
+    print(f"{REQUESTS} requests to a local mock server")
+    print(f"{'concurrency':>12} {'per-call':>10} {'shared':>10} {'speedup':>8}")
+    for concurrency in (1, CONCURRENCY):
+        results = []
+        for service in (PerCallService(), WeatherService()):
+            service.api_key = "benchmark"
+            service.base_url = base_url
+            service.cache = None
+            service.limiter = None
+            results.append(asyncio.run(timed(service, concurrency)))
+        per_call, shared = results
+        print(
+            f"{concurrency:>12} {per_call / REQUESTS * 1000:>8.2f}ms {shared / REQUESTS * 1000:>8.2f}ms"
+            f" {per_call / shared:>7.1f}x"
+        )
+
+    print(f"\n{REQUESTS} concurrent searches for one city, response cache off")
+    print(f"{'':>16} {'upstream':>9} {'wall':>9}")
+    for label, service in (("no single-flight", NoSingleFlightService()), ("single-flight", WeatherService())):
+        service.api_key = "benchmark"
+        service.base_url = base_url
+        service.cache = None
+        service.limiter = None
+        before = MockWeatherHandler.requests
+        elapsed = asyncio.run(spike(service))
+        print(f"{label:>16} {MockWeatherHandler.requests - before:>9} {elapsed * 1000:>7.0f}ms")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
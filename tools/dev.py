@@ -5,8 +5,14 @@ import os
 import sys
 import subprocess
 import argparse
+import importlib
 from pathlib import Path
 
+APPS = {
+    "todo_app": "apps/todo-app",
+    "weather_app": "apps/weather-app",
+}
+
 def run_command(command: str, cwd: str = None) -> int:
     """Run a shell command and return exit code."""
     print(f"Running: {command}")
@@ -98,6 +104,90 @@ def run_tests():
     print("Running tests...")
     return run_command("pytest") == 0
 
+def check_query_plans():
+    """Fail if a hot query of any app falls back to a full table scan."""
+    print("Checking query plans...")
+    sys.path.insert(0, os.path.abspath("packages"))
+    from sqlalchemy import create_engine
+    from shared.database import run_migrations, check_query_plans as find_scans
+
+    ok = True
+    for package, app_path in APPS.items():
+        sys.path.insert(0, os.path.abspath(app_path))
+        migrations = importlib.import_module(f"{package}.migrations").MIGRATIONS
+        queries = importlib.import_module(f"{package}.queries").HOT_QUERIES
+
+        # Check against a fresh in-memory database built from the migrations
+        engine = create_engine("sqlite://")
+        run_migrations(engine, migrations)
+        failures = find_scans(engine, queries)
+        engine.dispose()
+
+        for name in queries:
+            if name in failures:
+                ok = False
+                print(f"  FAIL {package}.{name}: {'; '.join(failures[name])}")
+            else:
+                print(f"  ok   {package}.{name}")
+
+    print("All hot queries use an index!" if ok else "Some hot queries scan whole tables")
+    return ok
+
+def _load_todo_app():
+    """Import the todo app from its own directory so it uses the app's database."""
+    os.chdir(APPS["todo_app"])
+    sys.path.insert(0, os.getcwd())
+    from todo_app import bulk, database
+    database.init_db()
+    return bulk, database
+
+def import_todos(path: str, fmt: str = None):
+    """Bulk import todos from a CSV or JSON Lines file."""
+    bulk, database = _load_todo_app()
+    fmt = fmt or bulk.detect_format(path)
+    print(f"Importing todos from {path} ({fmt})...")
+    with open(path, newline="", encoding="utf-8") as stream:
+        count = bulk.import_todos(database.engine, stream, fmt)
+    print(f"Imported {count} todos!")
+
+def export_todos(path: str, fmt: str = None):
+    """Stream all todos to a CSV or JSON Lines file."""
+    bulk, database = _load_todo_app()
+    fmt = fmt or bulk.detect_format(path)
+    print(f"Exporting todos to {path} ({fmt})...")
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        count = bulk.export_todos(database.engine, stream, fmt)
+    print(f"Exported {count} todos!")
+
+def vacuum_weather_db():
+    """Switch the weather database to incremental auto-vacuum, rebuilding it once."""
+    os.chdir(APPS["weather_app"])
+    sys.path.insert(0, os.getcwd())
+    from weather_app import database, retention
+    print("Rebuilding the weather database with incremental auto-vacuum (stop the app first)...")
+    if not retention.enable_incremental_vacuum(database.engine, rebuild=True):
+        print("Could not enable incremental auto-vacuum")
+        return False
+    database.init_db()
+    print("Incremental auto-vacuum enabled!")
+    return True
+
+def run_benchmark(name: str = None):
+    """Run one benchmark from tools/benchmarks, or all of them."""
+    bench_dir = Path("tools/benchmarks")
+    names = [name] if name else sorted(
+        path.stem for path in bench_dir.glob("*.py") if not path.stem.startswith("_")
+    )
+    ok = True
+    for bench in names:
+        script = bench_dir / f"{bench}.py"
+        if not script.exists():
+            print(f"Unknown benchmark: {bench}")
+            return False
+        print(f"\n== {bench} ==")
+        ok = run_command(f"{sys.executable} {script}") == 0 and ok
+    return ok
+
 def clean():
     """Clean build artifacts and cache files."""
     print("Cleaning build artifacts...")
@@ -140,10 +230,16 @@ def main():
     parser = argparse.ArgumentParser(description="Python Web Development Tools")
     parser.add_argument("command", choices=[
         "install", "todo", "weather", "build-todo", "build-weather",
-        "format", "lint", "typecheck", "test", "clean", "init"
+        "format", "lint", "typecheck", "test", "clean", "init", "check-plans",
+        "import-todos", "export-todos", "vacuum-weather", "bench"
     ], help="Command to run")
+    parser.add_argument("target", nargs="?", help="File for import-todos/export-todos, or benchmark name for bench")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from extension)")
     
     args = parser.parse_args()
+    path = os.path.abspath(args.target) if args.target else None
+    if args.command in ("import-todos", "export-todos") and not path:
+        parser.error(f"{args.command} requires a file path")
     
     # Ensure we're in the project root
     project_root = Path(__file__).parent.parent
@@ -173,6 +269,19 @@ def main():
         clean()
     elif args.command == "init":
         init_reflex_apps()
+    elif args.command == "check-plans":
+        if not check_query_plans():
+            sys.exit(1)
+    elif args.command == "import-todos":
+        import_todos(path, args.format)
+    elif args.command == "export-todos":
+        export_todos(path, args.format)
+    elif args.command == "vacuum-weather":
+        if not vacuum_weather_db():
+            sys.exit(1)
+    elif args.command == "bench":
+        if not run_benchmark(args.target):
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file